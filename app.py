@@ -1,21 +1,286 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for, send_from_directory
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, send_from_directory, Response, stream_with_context
 from db import Database
+from statements import sql, statement_name
+from queries import (InvalidQuery, cars_queries, cars_response, my_bookings_queries, bookings_response,
+                     staff_bookings_query, FILTER_QUERIES, filters_payload, filters_entry)
+from assignment import staff_load
+from pricing import rate_cards, rental_days, total_price, quote
+from stats import car_utilization, fleet_stats, stats_cache
+from passwords import hash_password, hash_passwords, verify_password, needs_rehash, is_hashed, HashPoolBusy
+from images import process_car_image, is_content_hashed, InvalidImageError
+import assets
+from cache import TTLCache, make_cache
+import metrics
+import json_provider
 import os
-from werkzeug.utils import secure_filename
-from datetime import datetime, timedelta
-from config import UPLOAD_FOLDER, ALLOWED_EXTENSIONS
-import json
+import csv
+import io
+import itertools
+import click
+from datetime import datetime
+from config import DB_CONFIG, UPLOAD_FOLDER, ALLOWED_EXTENSIONS, FUEL_TYPES, FILTERS_CACHE_TTL, CAR_CACHE_SIZE, CAR_CACHE_TTL, CAR_CACHE_URL, EXPORT_BATCH_SIZE, IMPORT_BATCH_SIZE, IMPORT_MAX_ROWS, QUOTE_MAX_CARS, STATS_TOP_MAX, STATS_PAGE_MAX, STATIC_MAX_AGE, UPLOAD_MAX_AGE
+import logging
+
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 app.secret_key = 'carola-secret-key-2024'
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 
+# Hand each request its own pooled connection and release it on teardown
+Database.init_app(app)
+# Report per-request database time in a Server-Timing header
+metrics.init_app(app)
+# orjson-backed jsonify (when installed) with gzip for larger JSON bodies
+json_provider.init_app(app)
+
 # Create upload folder if it doesn't exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+# Fingerprinted /assets/ URLs for CSS/JS (templates use asset_url() instead of url_for('static'))
+assets.init_app(app, exclude=[UPLOAD_FOLDER])
+
+# Filter options only change through the admin routes, which invalidate this cache.
+# The TTL bounds staleness for edits made directly in the database or by other workers.
+filters_cache = TTLCache(ttl=FILTERS_CACHE_TTL)
+
+# Assembled car detail records by car_id, for booking.html and the admin edit
+# modal. Car writes invalidate by id, but only in this worker's memory: other
+# workers serve the old record for up to CAR_CACHE_TTL. Set CAR_CACHE_URL to
+# share one Redis cache between workers so an invalidation reaches all of them.
+car_cache = make_cache(CAR_CACHE_URL, CAR_CACHE_SIZE, CAR_CACHE_TTL, prefix='carola:car:')
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def split_locations(value):
+    """Split a comma-separated location list into unique, trimmed names"""
+    locations = {}
+    for loc in (value or '').split(','):
+        clean_loc = loc.strip()
+        if clean_loc:
+            locations.setdefault(clean_loc.upper(), clean_loc)
+    return list(locations.values())
+
+def upgrade_password(user, password):
+    """Store a fresh hash for a plaintext or outdated password after a successful login"""
+    try:
+        Database.execute_query(sql(f"{user['USER_TYPE']}.set_password"), {
+            'password_hash': hash_password(password),
+            'user_id': user['USER_ID']
+        }, fetch=False)
+    except Exception as e:
+        # The login itself succeeded; the upgrade is retried on the next one
+        logger.warning(f"Could not rehash password for {user['USER_TYPE']} {user['USER_ID']}: {e}")
+
+def car_location_rows(car_id, available_locations):
+    """Car_Location binds for a car's available_locations list"""
+    return [
+        {'car_id': car_id, 'location_name': loc, 'location_key': loc.upper()}
+        for loc in split_locations(available_locations)
+    ]
+
+def sync_car_locations(cursor, car_id, available_locations):
+    """Rewrite a car's Car_Location rows to match its available_locations list"""
+    cursor.execute(sql('car_location.delete'), {'car_id': car_id})
+    rows = car_location_rows(car_id, available_locations)
+    if rows:
+        cursor.executemany(sql('car_location.insert'), rows)
+
+def sync_car_images(cursor, car_id, variants):
+    """Replace a car's Car_Image rows with the variants written by process_car_image"""
+    cursor.execute(sql('car_image.delete'), {'car_id': car_id})
+    rows = [
+        {'car_id': car_id, 'variant': name, 'filename': filename, 'width': width, 'height': height}
+        for name, (filename, width, height) in variants.items()
+    ]
+    if rows:
+        cursor.executemany(sql('car_image.insert'), rows)
+
+# Spellings accepted for yes/no columns in fleet import rows
+IMPORT_FLAGS = {'1': 1, 'true': 1, 'yes': 1, 'y': 1, 'on': 1, '0': 0, 'false': 0, 'no': 0, 'n': 0, 'off': 0}
+
+def import_flag(value, field, default):
+    """0/1 from a fleet import value; a missing or blank value takes the column default"""
+    if value is None or str(value).strip() == '':
+        return default
+    flag = IMPORT_FLAGS.get(str(value).strip().lower())
+    if flag is None:
+        raise ValueError(f'{field} must be yes or no, got {value!r}')
+    return flag
+
+def build_car_params(data, form=True):
+    """Car column binds from the admin car form, or from a fleet import row when form is False"""
+    for field in ('model_id', 'carType_id', 'rate'):
+        if not data.get(field):
+            raise ValueError(f'{field} is required')
+    
+    fuel_type = data.get('fuel_type')
+    description = data.get('description', '')
+    door = data.get('door')
+    suitcase = data.get('suitcase')
+    seat = data.get('seat')
+    colour = data.get('colour', '')
+    pickup_location = data.get('pickup_location', '')
+    dropoff_location = data.get('dropoff_location', '')
+    available_locations = data.get('available_locations', '')
+    if form:
+        # An unticked checkbox is not posted at all
+        allows_different_dropoff = 1 if data.get('allows_different_dropoff') in ('1', 1) else 0
+    else:
+        # Car.allows_different_dropoff defaults to 1
+        allows_different_dropoff = import_flag(data.get('allows_different_dropoff'), 'allows_different_dropoff', 1)
+    return {
+        'model_id': int(data['model_id']),
+        'carType_id': int(data['carType_id']),
+        'rate': float(data['rate']),
+        'description': description if description else None,
+        'door': int(door) if door else None,
+        'suitcase': int(suitcase) if suitcase else None,
+        'seat': int(seat) if seat else None,
+        'colour': colour if colour else None,
+        'attachments': None,
+        'pickup_location': pickup_location if pickup_location else None,
+        'dropoff_location': dropoff_location if dropoff_location else None,
+        'available_locations': available_locations if available_locations else None,
+        'allows_different_dropoff': allows_different_dropoff,
+        # Car.fuel_type mirrors the fuel subtables: without details no row is
+        # written, so the car is N/A, as migration 02 would backfill it
+        'fuel_type': fuel_type if fuel_type in FUEL_TYPES and fuel_params(None, fuel_type, data) else 'N/A'
+    }
+
+def fuel_params(car_id, fuel_type, data):
+    """Binds for the car's Petrol/Diesel/Electric row, or None when no details were given"""
+    if fuel_type == 'Petrol':
+        octane_rating = data.get('octane_rating')
+        fuel_tank = data.get('fuel_tank_capacity')
+        if octane_rating or fuel_tank:
+            return {
+                'car_id': car_id,
+                'octane_rating': int(octane_rating) if octane_rating else None,
+                'fuel_tank_capacity': float(fuel_tank) if fuel_tank else None
+            }
+    
+    elif fuel_type == 'Diesel':
+        diesel_emission = data.get('diesel_emission')
+        fuel_tank = data.get('fuel_tank_capacity')
+        if diesel_emission or fuel_tank:
+            return {
+                'car_id': car_id,
+                'diesel_emission': diesel_emission if diesel_emission else None,
+                'fuel_tank_capacity': float(fuel_tank) if fuel_tank else None
+            }
+    
+    elif fuel_type == 'Electric':
+        battery_range = data.get('battery_range')
+        charging_rate = data.get('charging_rate_kw')
+        last_charging = data.get('last_charging_date')
+        if battery_range or charging_rate or last_charging:
+            if last_charging:
+                datetime.strptime(last_charging, '%Y-%m-%d')  # reject bad dates before TO_DATE does
+            return {
+                'car_id': car_id,
+                'battery_range': int(battery_range) if battery_range else None,
+                'charging_rate_kw': float(charging_rate) if charging_rate else None,
+                'last_charging_date': last_charging if last_charging else None
+            }
+    return None
+
+def save_fuel_details(cursor, car_id, fuel_type, data, new=False):
+    """Write a car's fuel subtype row inside the caller's transaction
+
+    Existing cars upsert the row for their fuel type and drop any row left
+    over from a previous fuel type; new cars only need the insert.
+    """
+    details = fuel_params(car_id, fuel_type, data)
+    for fuel in FUEL_TYPES:
+        if details and fuel == fuel_type:
+            cursor.execute(sql(f'{fuel.lower()}.insert' if new else f'{fuel.lower()}.merge'), details)
+        elif not new:
+            cursor.execute(sql(f'{fuel.lower()}.delete'), {'car_id': car_id})
+
+def insert_car_batch(cursor, batch):
+    """Insert (car binds, source row) pairs with one executemany per table and return the new car ids"""
+    car_id_var = cursor.var(int, arraysize=len(batch))
+    cursor.setinputsizes(car_id=car_id_var)
+    cursor.executemany(sql('car.insert'), [params for params, _ in batch])
+    car_ids = [int(car_id_var.getvalue(pos)[0]) for pos in range(len(batch))]
+    
+    locations = []
+    fuel_rows = {fuel: [] for fuel in FUEL_TYPES}
+    for car_id, (params, row) in zip(car_ids, batch):
+        locations.extend(car_location_rows(car_id, params['available_locations']))
+        details = fuel_params(car_id, params['fuel_type'], row)
+        if details:
+            fuel_rows[params['fuel_type']].append(details)
+    
+    if locations:
+        cursor.executemany(sql('car_location.insert'), locations)
+    for fuel, rows in fuel_rows.items():
+        if rows:
+            cursor.executemany(sql(f'{fuel.lower()}.insert'), rows)
+    return car_ids
+
+def read_import_rows():
+    """Rows of a fleet import: an uploaded or posted CSV file, or a JSON list of cars"""
+    if 'file' in request.files:
+        text = request.files['file'].read().decode('utf-8-sig')
+        return list(csv.DictReader(io.StringIO(text)))
+    if request.mimetype == 'text/csv':
+        return list(csv.DictReader(io.StringIO(request.get_data(as_text=True))))
+    
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('cars')
+    if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+        raise ValueError('Expected a CSV file or a JSON list of cars')
+    return data
+
+def add_image_url(car):
+    """Set IMAGE_URL to the resized variant, falling back to the original upload"""
+    filename = car.pop('IMAGE_FILE', None) or car.get('ATTACHMENTS')
+    car['IMAGE_URL'] = url_for('uploaded_file', filename=filename) if filename else None
+
+def load_car(car_id):
+    """Car detail record with IMAGE_URL, read through car_cache (None if there is no such car)
+
+    The record may be shared with other requests, so callers must not modify it.
+    """
+    car = car_cache.get(car_id)
+    if car is None:
+        result = Database.execute_query(sql('car.detail'), {'car_id': car_id}, json_ready=True)
+        if not result:
+            return None
+        car = result[0]
+        add_image_url(car)
+        car_cache.set(car_id, car)
+    return car
+
+# Columns of the staff bookings query, in CSV export order
+BOOKING_EXPORT_COLUMNS = (
+    'BOOKING_ID', 'PICKUP_DATE', 'DROPOFF_DATE', 'PICKUP_LOCATION', 'DROPOFF_LOCATION', 'PRICE',
+    'CAR_ID', 'MODEL_NAME', 'BRAND_NAME', 'COLOUR', 'RATE',
+    'CUSTOMER_NAME', 'CUST_EMAIL', 'CUST_PHONE', 'PAYMENT_STATUS'
+)
+
+def csv_chunks(batches):
+    """Render row batches as CSV text, one chunk per batch"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=BOOKING_EXPORT_COLUMNS)
+    writer.writeheader()
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()  # header only: no rows matched
+
+def ndjson_chunks(batches):
+    """Render row batches as newline-delimited JSON, one chunk per batch"""
+    for batch in batches:
+        yield ''.join(app.json.dumps(row) + '\n' for row in batch)
+
 # ==================== AUTHENTICATION ROUTES ====================
 
 @app.route('/')
@@ -27,10 +292,6 @@ def register():
     if request.method == 'POST':
         data = request.json
         try:
-            query = """
-                INSERT INTO Customer (cust_fname, cust_lname, cust_age, cust_email, cust_phone, cust_username, cust_password)
-                VALUES (:fname, :lname, :age, :email, :phone, :username, :password)
-            """
             params = {
                 'fname': data['fname'],
                 'lname': data['lname'],
@@ -38,10 +299,12 @@ def register():
                 'email': data['email'],
                 'phone': data.get('phone'),
                 'username': data['username'],
-                'password': data['password']
+                'password': hash_password(data['password'])
             }
-            Database.execute_query(query, params, fetch=False)
+            Database.execute_query(sql('customer.insert'), params, fetch=False)
             return jsonify({'success': True, 'message': 'Registration successful!'})
+        except HashPoolBusy as e:
+            return jsonify({'success': False, 'message': str(e)}), 503
         except Exception as e:
             return jsonify({'success': False, 'message': str(e)}), 400
     return render_template('register.html')
@@ -55,36 +318,27 @@ def login():
             username = data['username']
             password = data['password']
             
-            # First, try to find user in Customer table
-            customer_query = "SELECT cust_id, cust_fname, cust_lname, cust_email, cust_username FROM Customer WHERE cust_username = :username AND cust_password = :password"
-            customer_result = Database.execute_query(customer_query, {'username': username, 'password': password})
+            # One lookup across Customer and Staff; the password is checked here, not in SQL
+            accounts = Database.execute_query(sql('account.by_username'), {'username': username})
+            user = next((account for account in accounts if verify_password(account['PASSWORD_HASH'], password)), None)
+            if not accounts:
+                verify_password(None, password)
+            if user is None:
+                return jsonify({'success': False, 'message': 'Invalid username or password'}), 401
             
-            if customer_result:
-                # User is a customer
-                user = customer_result[0]
-                session['user_id'] = user['CUST_ID']
-                session['username'] = user['CUST_USERNAME']
-                session['name'] = f"{user['CUST_FNAME']} {user['CUST_LNAME']}"
-                session['user_type'] = 'customer'
-                return jsonify({'success': True, 'user_type': 'customer', 'message': 'Login successful!'})
+            if needs_rehash(user['PASSWORD_HASH']):
+                upgrade_password(user, password)
             
-            # If not found in Customer, try Staff table
-            staff_query = "SELECT staff_id, staff_fname, staff_lname, staff_email, staff_username, staff_dept FROM Staff WHERE staff_username = :username AND staff_password = :password"
-            staff_result = Database.execute_query(staff_query, {'username': username, 'password': password})
-            
-            if staff_result:
-                # User is staff
-                user = staff_result[0]
-                session['user_id'] = user['STAFF_ID']
-                session['username'] = user['STAFF_USERNAME']
-                session['name'] = f"{user['STAFF_FNAME']} {user['STAFF_LNAME']}"
-                session['dept'] = user.get('STAFF_DEPT', '')
-                session['user_type'] = 'staff'
-                return jsonify({'success': True, 'user_type': 'staff', 'message': 'Login successful!'})
-            
-            # If not found in either table
-            return jsonify({'success': False, 'message': 'Invalid username or password'}), 401
+            session['user_id'] = user['USER_ID']
+            session['username'] = user['USERNAME']
+            session['name'] = f"{user['FNAME']} {user['LNAME']}"
+            if user['USER_TYPE'] == 'staff':
+                session['dept'] = user['DEPT'] or ''
+            session['user_type'] = user['USER_TYPE']
+            return jsonify({'success': True, 'user_type': user['USER_TYPE'], 'message': 'Login successful!'})
             
+        except HashPoolBusy as e:
+            return jsonify({'success': False, 'message': str(e)}), 503
         except Exception as e:
             return jsonify({'success': False, 'message': str(e)}), 400
     
@@ -104,167 +358,49 @@ def cars():
 @app.route('/api/cars', methods=['GET'])
 def get_cars():
     try:
-        location = request.args.get('location', '')
-        car_type = request.args.get('type', '')
-        brand = request.args.get('brand', '')
-        fuel_type = request.args.get('fuel_type', '')
-        seats = request.args.get('seats', '')
-        bags = request.args.get('bags', '')
-        min_price = request.args.get('min_price', '')
-        max_price = request.args.get('max_price', '')
-        
-        query = """
-            SELECT c.car_id, c.rate, c.description, c.door, c.suitcase, c.seat, c.colour,
-                   c.pickup_location, c.dropoff_location, c.available_locations, c.allows_different_dropoff,
-                   c.attachments,
-                   m.model_name, b.brand_name, ct.carType_name,
-                   CASE 
-                       WHEN EXISTS (SELECT 1 FROM Petrol WHERE car_id = c.car_id) THEN 'Petrol'
-                       WHEN EXISTS (SELECT 1 FROM Diesel WHERE car_id = c.car_id) THEN 'Diesel'
-                       WHEN EXISTS (SELECT 1 FROM Electric WHERE car_id = c.car_id) THEN 'Electric'
-                       ELSE 'N/A'
-                   END as fuel_type
-            FROM Car c
-            JOIN Model m ON c.model_id = m.model_id
-            JOIN Brand b ON m.brand_id = b.brand_id
-            JOIN CarType ct ON c.carType_id = ct.carType_id
-            WHERE 1=1
-        """
-        params = {}
-        
-        if location:
-            query += " AND (UPPER(c.available_locations) LIKE UPPER(:location) OR UPPER(c.pickup_location) LIKE UPPER(:location))"
-            params['location'] = f'%{location}%'
-        
-        if car_type:
-            query += " AND ct.carType_id = :car_type"
-            params['car_type'] = int(car_type)
-        
-        if brand:
-            query += " AND b.brand_id = :brand"
-            params['brand'] = int(brand)
-        
-        if fuel_type:
-            if fuel_type == 'Petrol':
-                query += " AND EXISTS (SELECT 1 FROM Petrol WHERE car_id = c.car_id)"
-            elif fuel_type == 'Diesel':
-                query += " AND EXISTS (SELECT 1 FROM Diesel WHERE car_id = c.car_id)"
-            elif fuel_type == 'Electric':
-                query += " AND EXISTS (SELECT 1 FROM Electric WHERE car_id = c.car_id)"
-        
-        if seats:
-            query += " AND c.seat = :seats"
-            params['seats'] = int(seats)
-        
-        if bags:
-            query += " AND c.suitcase = :bags"
-            params['bags'] = int(bags)
-        
-        if min_price:
-            query += " AND c.rate >= :min_price"
-            params['min_price'] = float(min_price)
-        
-        if max_price:
-            query += " AND c.rate <= :max_price"
-            params['max_price'] = float(max_price)
-        
-        query += " ORDER BY c.rate"
-        
-        cars = Database.execute_query(query, params)
-        
-        # Convert Oracle NUMBER to Python int/float
-        for car in cars:
-            for key, value in car.items():
-                if isinstance(value, (int, float)):
-                    car[key] = float(value) if '.' in str(value) else int(value)
+        try:
+            count, (query, params), limit = cars_queries(request.args)
+        except InvalidQuery as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
         
-        return jsonify({'success': True, 'cars': cars})
+        total = None
+        if count is not None:
+            total = int(Database.execute_query(*count)[0]['CNT'])
+        cars = Database.execute_query(query, params, json_ready=True)
+        return jsonify(cars_response(cars, limit, total, add_image_url))
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
 @app.route('/api/car/<int:car_id>', methods=['GET'])
 def get_car(car_id):
     try:
-        query = """
-            SELECT c.car_id, c.rate, c.description, c.door, c.suitcase, c.seat, c.colour,
-                   c.pickup_location, c.dropoff_location, c.available_locations, c.allows_different_dropoff,
-                   c.attachments,
-                   m.model_name, b.brand_name, ct.carType_name,
-                   CASE 
-                       WHEN EXISTS (SELECT 1 FROM Petrol WHERE car_id = c.car_id) THEN 'Petrol'
-                       WHEN EXISTS (SELECT 1 FROM Diesel WHERE car_id = c.car_id) THEN 'Diesel'
-                       WHEN EXISTS (SELECT 1 FROM Electric WHERE car_id = c.car_id) THEN 'Electric'
-                       ELSE 'N/A'
-                   END as fuel_type,
-                   p.octane_rating, p.fuel_tank_capacity as petrol_tank,
-                   d.diesel_emission, d.fuel_tank_capacity as diesel_tank,
-                   e.battery_range, e.charging_rate_kw, e.last_charging_date
-            FROM Car c
-            JOIN Model m ON c.model_id = m.model_id
-            JOIN Brand b ON m.brand_id = b.brand_id
-            JOIN CarType ct ON c.carType_id = ct.carType_id
-            LEFT JOIN Petrol p ON c.car_id = p.car_id
-            LEFT JOIN Diesel d ON c.car_id = d.car_id
-            LEFT JOIN Electric e ON c.car_id = e.car_id
-            WHERE c.car_id = :car_id
-        """
-        result = Database.execute_query(query, {'car_id': car_id})
+        car = load_car(car_id)
         
-        if result:
-            car = result[0]
-            # Convert Oracle types
-            for key, value in car.items():
-                if isinstance(value, (int, float)):
-                    car[key] = float(value) if '.' in str(value) else int(value)
-                elif hasattr(value, 'isoformat'):  # Date object
-                    car[key] = value.isoformat() if value else None
+        if car:
             return jsonify({'success': True, 'car': car})
         else:
             return jsonify({'success': False, 'message': 'Car not found'}), 404
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
+def load_filters():
+    """Query the filter options shown on the cars and admin pages"""
+    return filters_payload(*(Database.execute_query(sql(name)) for name in FILTER_QUERIES))
+
 @app.route('/api/filters', methods=['GET'])
 def get_filters():
     try:
-        brands = Database.execute_query("SELECT brand_id, brand_name FROM Brand ORDER BY brand_name")
-        types = Database.execute_query("SELECT carType_id, carType_name FROM CarType ORDER BY carType_name")
-        
-        # Get all available_locations from cars
-        locations_query = "SELECT DISTINCT available_locations FROM Car WHERE available_locations IS NOT NULL"
-        locations_result = Database.execute_query(locations_query)
-        
-        # Extract unique locations and clean them
-        locations_set = set()
-        for row in locations_result:
-            if row.get('AVAILABLE_LOCATIONS'):
-                # Split by comma and clean each location
-                locs = row['AVAILABLE_LOCATIONS'].split(',')
-                for loc in locs:
-                    clean_loc = loc.strip()
-                    if clean_loc:
-                        locations_set.add(clean_loc)
-        
-        locations = sorted(list(locations_set))
-        
-        # Get unique seats
-        seats_query = "SELECT DISTINCT seat FROM Car WHERE seat IS NOT NULL ORDER BY seat"
-        seats_result = Database.execute_query(seats_query)
-        seats = [{'seat': int(row['SEAT'])} for row in seats_result]
-        
-        # Get unique bags (suitcase)
-        bags_query = "SELECT DISTINCT suitcase FROM Car WHERE suitcase IS NOT NULL ORDER BY suitcase"
-        bags_result = Database.execute_query(bags_query)
-        bags = [{'bag': int(row['SUITCASE'])} for row in bags_result]
-        
-        return jsonify({
-            'success': True,
-            'brands': brands,
-            'types': types,
-            'locations': [{'location': loc} for loc in locations],
-            'seats': seats,
-            'bags': bags
-        })
+        cached = filters_cache.get('filters')
+        if cached is None:
+            cached = filters_entry(load_filters())
+            filters_cache.set('filters', cached)
+        
+        response = jsonify({'success': True, **cached['filters']})
+        response.set_etag(cached['etag'])
+        response.last_modified = cached['last_modified']
+        # Let browsers keep the payload but revalidate it on every page load
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -285,62 +421,61 @@ def create_booking():
         data = request.json
         cust_id = session['user_id']
         
-        # Get first available staff
-        staff_query = "SELECT staff_id FROM Staff WHERE ROWNUM = 1"
-        staff_result = Database.execute_query(staff_query)
-        if not staff_result:
-            return jsonify({'success': False, 'message': 'No staff available'}), 400
-        staff_id = staff_result[0]['STAFF_ID']
-        
-        # Calculate price
-        car_query = "SELECT rate FROM Car WHERE car_id = :car_id"
-        car_result = Database.execute_query(car_query, {'car_id': data['car_id']})
-        if not car_result:
-            return jsonify({'success': False, 'message': 'Car not found'}), 404
-        
-        rate = float(car_result[0]['RATE'])
         pickup_date = datetime.strptime(data['pickup_date'], '%Y-%m-%d')
         dropoff_date = datetime.strptime(data['dropoff_date'], '%Y-%m-%d')
-        days = (dropoff_date - pickup_date).days + 1
-        price = rate * days
-        
-        # Check for conflicts
-        conflict_query = """
-            SELECT COUNT(*) as cnt FROM Booking
-            WHERE car_id = :car_id
-            AND ((pickup_date <= :pickup_date AND dropoff_date >= :pickup_date)
-                 OR (pickup_date <= :dropoff_date AND dropoff_date >= :dropoff_date)
-                 OR (pickup_date >= :pickup_date AND dropoff_date <= :dropoff_date))
-        """
-        conflict_result = Database.execute_query(conflict_query, {
-            'car_id': data['car_id'],
-            'pickup_date': pickup_date,
-            'dropoff_date': dropoff_date
-        })
-        
-        if conflict_result and conflict_result[0]['CNT'] > 0:
-            return jsonify({'success': False, 'message': 'Car is not available for selected dates'}), 400
+        if dropoff_date < pickup_date:
+            return jsonify({'success': False, 'message': 'Drop-off date must be on or after pickup date'}), 400
         
-        # Create booking
-        booking_query = """
-            INSERT INTO Booking (cust_id, staff_id, car_id, pickup_date, dropoff_date, pickup_location, dropoff_location, price)
-            VALUES (:cust_id, :staff_id, :car_id, :pickup_date, :dropoff_date, :pickup_location, :dropoff_location, :price)
-        """
-        Database.execute_query(booking_query, {
-            'cust_id': cust_id,
-            'staff_id': staff_id,
-            'car_id': data['car_id'],
-            'pickup_date': pickup_date,
-            'dropoff_date': dropoff_date,
-            'pickup_location': data['pickup_location'],
-            'dropoff_location': data['dropoff_location'],
-            'price': price
-        }, fetch=False)
+        # Least-loaded staff member for the pickup branch, picked before the car row is
+        # locked so a reload of the load table never runs while the lock is held
+        staff_id, generation = staff_load.assign(data['pickup_location'])
+        if staff_id is None:
+            return jsonify({'success': False, 'message': 'No staff available'}), 400
         
-        # Get the booking_id
-        booking_id_query = "SELECT booking_id FROM (SELECT booking_id FROM Booking WHERE cust_id = :cust_id ORDER BY booking_id DESC) WHERE ROWNUM = 1"
-        booking_result = Database.execute_query(booking_id_query, {'cust_id': cust_id})
-        booking_id = booking_result[0]['BOOKING_ID'] if booking_result else None
+        booked = False
+        try:
+            # Lock the car row, check for conflicts and insert in one transaction so two
+            # customers cannot both pass the availability check for the same car
+            with Database.transaction() as cursor:
+                cursor.execute(sql('car.lock_rate'), {'car_id': data['car_id']})
+                car_row = cursor.fetchone()
+                if not car_row:
+                    return jsonify({'success': False, 'message': 'Car not found'}), 404
+                
+                # Price from the locked rate, which also refreshes the quote cache
+                rate = float(car_row[0])
+                rate_cards.set(int(data['car_id']), rate)
+                price = total_price(rate, rental_days(pickup_date, dropoff_date))
+                
+                # Check for conflicts: two ranges overlap when each starts before the other ends
+                cursor.execute(sql('booking.conflicts'), {
+                    'car_id': data['car_id'],
+                    'pickup_date': pickup_date,
+                    'dropoff_date': dropoff_date
+                })
+                if cursor.fetchone()[0] > 0:
+                    return jsonify({'success': False, 'message': 'Car is not available for selected dates'}), 400
+                
+                # Create booking
+                booking_id_var = cursor.var(int)
+                cursor.execute(sql('booking.insert'), {
+                    'cust_id': cust_id,
+                    'staff_id': staff_id,
+                    'car_id': data['car_id'],
+                    'pickup_date': pickup_date,
+                    'dropoff_date': dropoff_date,
+                    'pickup_location': data['pickup_location'],
+                    'dropoff_location': data['dropoff_location'],
+                    'price': price,
+                    'booking_id': booking_id_var
+                })
+                booking_id = booking_id_var.getvalue()[0]
+            booked = True
+        finally:
+            # Nothing was committed: take the booking back off the staff member's count
+            if not booked:
+                staff_load.release(staff_id, generation)
+        stats_cache.invalidate()
         
         return jsonify({
             'success': True,
@@ -351,55 +486,81 @@ def create_booking():
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
+@app.route('/api/quote', methods=['GET'])
+def get_quote():
+    """Price one or more cars (car_ids=1,2,3) for a pickup/drop-off date range"""
+    try:
+        car_ids = [int(car_id) for car_id in request.args.get('car_ids', '').split(',') if car_id.strip()]
+        pickup_date = datetime.strptime(request.args.get('pickup_date', ''), '%Y-%m-%d')
+        dropoff_date = datetime.strptime(request.args.get('dropoff_date', ''), '%Y-%m-%d')
+        days = rental_days(pickup_date, dropoff_date)
+    except ValueError:
+        return jsonify({'success': False, 'message': 'car_ids, pickup_date and dropoff_date required (dates as YYYY-MM-DD, drop-off on or after pickup)'}), 400
+    if not car_ids:
+        return jsonify({'success': False, 'message': 'car_ids required'}), 400
+    if len(car_ids) > QUOTE_MAX_CARS:
+        return jsonify({'success': False, 'message': f'At most {QUOTE_MAX_CARS} cars per quote'}), 400
+    
+    try:
+        quotes = quote(car_ids, pickup_date, dropoff_date)
+        return jsonify({
+            'success': True,
+            'days': days,
+            'quotes': [quotes[car_id] for car_id in dict.fromkeys(car_ids) if car_id in quotes],
+            'not_found': [car_id for car_id in dict.fromkeys(car_ids) if car_id not in quotes]
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
 @app.route('/api/my-bookings', methods=['GET'])
 def get_my_bookings():
     if 'user_id' not in session:
         return jsonify({'success': False, 'message': 'Please login'}), 401
     
     try:
-        if session.get('user_type') == 'customer':
-            query = """
-                SELECT b.booking_id, b.pickup_date, b.dropoff_date, b.pickup_location, b.dropoff_location, b.price,
-                       c.car_id, m.model_name, br.brand_name, c.colour, c.rate,
-                       CASE WHEN p.booking_id IS NOT NULL THEN 'Paid' ELSE 'Pending' END as payment_status
-                FROM Booking b
-                JOIN Car c ON b.car_id = c.car_id
-                JOIN Model m ON c.model_id = m.model_id
-                JOIN Brand br ON m.brand_id = br.brand_id
-                LEFT JOIN Payment p ON b.booking_id = p.booking_id
-                WHERE b.cust_id = :user_id
-                ORDER BY b.pickup_date DESC
-            """
-            params = {'user_id': session['user_id']}
-        else:
-            query = """
-                SELECT b.booking_id, b.pickup_date, b.dropoff_date, b.pickup_location, b.dropoff_location, b.price,
-                       c.car_id, m.model_name, br.brand_name, c.colour, c.rate,
-                       cu.cust_fname || ' ' || cu.cust_lname as customer_name, cu.cust_email, cu.cust_phone,
-                       CASE WHEN p.booking_id IS NOT NULL THEN 'Paid' ELSE 'Pending' END as payment_status
-                FROM Booking b
-                JOIN Car c ON b.car_id = c.car_id
-                JOIN Model m ON c.model_id = m.model_id
-                JOIN Brand br ON m.brand_id = br.brand_id
-                JOIN Customer cu ON b.cust_id = cu.cust_id
-                LEFT JOIN Payment p ON b.booking_id = p.booking_id
-                ORDER BY b.pickup_date DESC
-            """
-            params = {}
-        
-        bookings = Database.execute_query(query, params)
-        
-        # Convert Oracle types
-        for booking in bookings:
-            for key, value in booking.items():
-                if isinstance(value, (int, float)):
-                    booking[key] = float(value) if '.' in str(value) else int(value)
-                elif hasattr(value, 'isoformat'):
-                    booking[key] = value.isoformat() if value else None
+        try:
+            count, (query, params), limit = my_bookings_queries(session.get('user_type'), session['user_id'], request.args)
+        except InvalidQuery as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
         
-        return jsonify({'success': True, 'bookings': bookings})
+        total = None
+        if count is not None:
+            total = int(Database.execute_query(*count)[0]['CNT'])
+        bookings = Database.execute_query(query, params, json_ready=True)
+        return jsonify(bookings_response(bookings, limit, total))
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@app.route('/api/admin/bookings/export', methods=['GET'])
+def admin_export_bookings():
+    """Stream the filtered staff bookings view as CSV or NDJSON"""
+    if 'user_id' not in session or session.get('user_type') != 'staff':
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 401
+    
+    export_format = request.args.get('format', 'csv')
+    if export_format not in ('csv', 'ndjson'):
+        return jsonify({'success': False, 'message': 'format must be csv or ndjson'}), 400
+    try:
+        query, params = staff_bookings_query(request.args)
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Invalid booking filters'}), 400
+    query += " ORDER BY b.pickup_date DESC, b.booking_id DESC"
+    
+    try:
+        batches = Database.stream_query(query, params, batch_size=EXPORT_BATCH_SIZE)
+        # Run the query before streaming starts so failures still get a JSON error
+        first = next(batches, None)
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
+    batches = itertools.chain([first] if first else [], batches)
+    
+    if export_format == 'csv':
+        body, mimetype = csv_chunks(batches), 'text/csv'
+    else:
+        body, mimetype = ndjson_chunks(batches), 'application/x-ndjson'
+    filename = f"bookings-{datetime.now():%Y%m%d}.{export_format}"
+    return Response(stream_with_context(body), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
 
 @app.route('/my-bookings')
 def my_bookings():
@@ -419,8 +580,7 @@ def process_payment():
         booking_id = data['booking_id']
         
         # Verify booking belongs to user
-        verify_query = "SELECT price FROM Booking WHERE booking_id = :booking_id AND cust_id = :cust_id"
-        verify_result = Database.execute_query(verify_query, {
+        verify_result = Database.execute_query(sql('booking.price_for_customer'), {
             'booking_id': booking_id,
             'cust_id': session['user_id']
         })
@@ -429,24 +589,18 @@ def process_payment():
             return jsonify({'success': False, 'message': 'Booking not found or unauthorized'}), 404
         
         # Check if already paid
-        payment_check = Database.execute_query(
-            "SELECT booking_id FROM Payment WHERE booking_id = :booking_id",
-            {'booking_id': booking_id}
-        )
+        payment_check = Database.execute_query(sql('payment.exists'), {'booking_id': booking_id})
         
         if payment_check:
             return jsonify({'success': False, 'message': 'Payment already processed'}), 400
         
         # Create payment
         amount = float(verify_result[0]['PRICE'])
-        payment_query = """
-            INSERT INTO Payment (booking_id, amount, payment_date)
-            VALUES (:booking_id, :amount, SYSDATE)
-        """
-        Database.execute_query(payment_query, {
+        Database.execute_query(sql('payment.insert'), {
             'booking_id': booking_id,
             'amount': amount
         }, fetch=False)
+        stats_cache.invalidate()
         
         return jsonify({'success': True, 'message': 'Payment processed successfully!'})
     except Exception as e:
@@ -467,28 +621,10 @@ def admin_get_cars():
         return jsonify({'success': False, 'message': 'Unauthorized'}), 401
     
     try:
-        query = """
-            SELECT c.car_id, c.rate, c.description, c.door, c.suitcase, c.seat, c.colour,
-                   c.attachments, c.pickup_location, c.dropoff_location, c.available_locations,
-                   m.model_id, m.model_name, b.brand_id, b.brand_name, ct.carType_id, ct.carType_name,
-                   CASE 
-                       WHEN EXISTS (SELECT 1 FROM Petrol WHERE car_id = c.car_id) THEN 'Petrol'
-                       WHEN EXISTS (SELECT 1 FROM Diesel WHERE car_id = c.car_id) THEN 'Diesel'
-                       WHEN EXISTS (SELECT 1 FROM Electric WHERE car_id = c.car_id) THEN 'Electric'
-                       ELSE 'N/A'
-                   END as fuel_type
-            FROM Car c
-            JOIN Model m ON c.model_id = m.model_id
-            JOIN Brand b ON m.brand_id = b.brand_id
-            JOIN CarType ct ON c.carType_id = ct.carType_id
-            ORDER BY c.car_id DESC
-        """
-        cars = Database.execute_query(query)
+        cars = Database.execute_query(sql('admin.cars'), json_ready=True)
         
         for car in cars:
-            for key, value in car.items():
-                if isinstance(value, (int, float)):
-                    car[key] = float(value) if '.' in str(value) else int(value)
+            add_image_url(car)
         
         return jsonify({'success': True, 'cars': cars})
     except Exception as e:
@@ -501,38 +637,9 @@ def admin_get_car(car_id):
         return jsonify({'success': False, 'message': 'Unauthorized'}), 401
     
     try:
-        query = """
-            SELECT c.car_id, c.rate, c.description, c.door, c.suitcase, c.seat, c.colour,
-                   c.attachments, c.pickup_location, c.dropoff_location, c.available_locations,
-                   c.allows_different_dropoff,
-                   m.model_id, m.model_name, b.brand_id, b.brand_name, ct.carType_id, ct.carType_name,
-                   CASE 
-                       WHEN EXISTS (SELECT 1 FROM Petrol WHERE car_id = c.car_id) THEN 'Petrol'
-                       WHEN EXISTS (SELECT 1 FROM Diesel WHERE car_id = c.car_id) THEN 'Diesel'
-                       WHEN EXISTS (SELECT 1 FROM Electric WHERE car_id = c.car_id) THEN 'Electric'
-                       ELSE 'N/A'
-                   END as fuel_type,
-                   p.octane_rating, p.fuel_tank_capacity as petrol_tank,
-                   d.diesel_emission, d.fuel_tank_capacity as diesel_tank,
-                   e.battery_range, e.charging_rate_kw, e.last_charging_date
-            FROM Car c
-            JOIN Model m ON c.model_id = m.model_id
-            JOIN Brand b ON m.brand_id = b.brand_id
-            JOIN CarType ct ON c.carType_id = ct.carType_id
-            LEFT JOIN Petrol p ON c.car_id = p.car_id
-            LEFT JOIN Diesel d ON c.car_id = d.car_id
-            LEFT JOIN Electric e ON c.car_id = e.car_id
-            WHERE c.car_id = :car_id
-        """
-        result = Database.execute_query(query, {'car_id': car_id})
+        car = load_car(car_id)
         
-        if result:
-            car = result[0]
-            for key, value in car.items():
-                if isinstance(value, (int, float)):
-                    car[key] = float(value) if '.' in str(value) else int(value)
-                elif hasattr(value, 'isoformat'):
-                    car[key] = value.isoformat() if value else None
+        if car:
             return jsonify({'success': True, 'car': car})
         else:
             return jsonify({'success': False, 'message': 'Car not found'}), 404
@@ -546,125 +653,36 @@ def admin_create_car():
         return jsonify({'success': False, 'message': 'Unauthorized'}), 401
     
     try:
-        model_id = int(request.form.get('model_id'))
-        carType_id = int(request.form.get('carType_id'))
-        rate = float(request.form.get('rate'))
-        fuel_type = request.form.get('fuel_type')
-        description = request.form.get('description', '')
-        door = request.form.get('door')
-        suitcase = request.form.get('suitcase')
-        seat = request.form.get('seat')
-        colour = request.form.get('colour', '')
-        pickup_location = request.form.get('pickup_location', '')
-        dropoff_location = request.form.get('dropoff_location', '')
-        available_locations = request.form.get('available_locations', '')
-        allows_different_dropoff = 1 if request.form.get('allows_different_dropoff') == '1' else 0
-        
-        # Handle image upload
+        car_params = build_car_params(request.form)
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    try:
+        # Handle image upload: keep the original and write resized variants
         filename = None
+        variants = None
         if 'attachments' in request.files:
             file = request.files['attachments']
             if file and file.filename != '' and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                file.save(filepath)
-        
-        # Insert car
-        car_query = """
-            INSERT INTO Car (model_id, carType_id, rate, description, door, suitcase, seat, colour,
-                           attachments, pickup_location, dropoff_location, available_locations, allows_different_dropoff)
-            VALUES (:model_id, :carType_id, :rate, :description, :door, :suitcase, :seat, :colour,
-                   :attachments, :pickup_location, :dropoff_location, :available_locations, :allows_different_dropoff)
-            RETURNING car_id INTO :car_id
-        """
-        
-        # Oracle doesn't support RETURNING in the same way, so we'll use a different approach
-        car_query = """
-            INSERT INTO Car (model_id, carType_id, rate, description, door, suitcase, seat, colour,
-                           attachments, pickup_location, dropoff_location, available_locations, allows_different_dropoff)
-            VALUES (:model_id, :carType_id, :rate, :description, :door, :suitcase, :seat, :colour,
-                   :attachments, :pickup_location, :dropoff_location, :available_locations, :allows_different_dropoff)
-        """
-        
-        car_params = {
-            'model_id': model_id,
-            'carType_id': carType_id,
-            'rate': rate,
-            'description': description if description else None,
-            'door': int(door) if door else None,
-            'suitcase': int(suitcase) if suitcase else None,
-            'seat': int(seat) if seat else None,
-            'colour': colour if colour else None,
-            'attachments': filename,
-            'pickup_location': pickup_location if pickup_location else None,
-            'dropoff_location': dropoff_location if dropoff_location else None,
-            'available_locations': available_locations if available_locations else None,
-            'allows_different_dropoff': allows_different_dropoff
-        }
-        
-        Database.execute_query(car_query, car_params, fetch=False)
-        
-        # Get the inserted car_id
-        get_id_query = "SELECT car_id FROM Car WHERE ROWID = (SELECT MAX(ROWID) FROM Car)"
-        car_result = Database.execute_query(get_id_query)
-        car_id = car_result[0]['CAR_ID'] if car_result else None
-        
-        if not car_id:
-            return jsonify({'success': False, 'message': 'Failed to create car'}), 500
-        
-        # Insert fuel type specific data
-        if fuel_type == 'Petrol':
-            octane_rating = request.form.get('octane_rating')
-            fuel_tank = request.form.get('fuel_tank_capacity')
-            if octane_rating or fuel_tank:
-                petrol_query = """
-                    INSERT INTO Petrol (car_id, octane_rating, fuel_tank_capacity)
-                    VALUES (:car_id, :octane_rating, :fuel_tank_capacity)
-                """
-                Database.execute_query(petrol_query, {
-                    'car_id': car_id,
-                    'octane_rating': int(octane_rating) if octane_rating else None,
-                    'fuel_tank_capacity': float(fuel_tank) if fuel_tank else None
-                }, fetch=False)
-        
-        elif fuel_type == 'Diesel':
-            diesel_emission = request.form.get('diesel_emission')
-            fuel_tank = request.form.get('fuel_tank_capacity')
-            if diesel_emission or fuel_tank:
-                diesel_query = """
-                    INSERT INTO Diesel (car_id, diesel_emission, fuel_tank_capacity)
-                    VALUES (:car_id, :diesel_emission, :fuel_tank_capacity)
-                """
-                Database.execute_query(diesel_query, {
-                    'car_id': car_id,
-                    'diesel_emission': diesel_emission if diesel_emission else None,
-                    'fuel_tank_capacity': float(fuel_tank) if fuel_tank else None
-                }, fetch=False)
-        
-        elif fuel_type == 'Electric':
-            battery_range = request.form.get('battery_range')
-            charging_rate = request.form.get('charging_rate_kw')
-            last_charging = request.form.get('last_charging_date')
-            if battery_range or charging_rate or last_charging:
-                if last_charging:
-                    electric_query = """
-                        INSERT INTO Electric (car_id, battery_range, charging_rate_kw, last_charging_date)
-                        VALUES (:car_id, :battery_range, :charging_rate_kw, TO_DATE(:last_charging_date, 'YYYY-MM-DD'))
-                    """
-                else:
-                    electric_query = """
-                        INSERT INTO Electric (car_id, battery_range, charging_rate_kw)
-                        VALUES (:car_id, :battery_range, :charging_rate_kw)
-                    """
-                electric_params = {
-                    'car_id': car_id,
-                    'battery_range': int(battery_range) if battery_range else None,
-                    'charging_rate_kw': float(charging_rate) if charging_rate else None
-                }
-                if last_charging:
-                    electric_params['last_charging_date'] = last_charging
-                Database.execute_query(electric_query, electric_params, fetch=False)
+                try:
+                    filename, variants = process_car_image(file, app.config['UPLOAD_FOLDER'])
+                except InvalidImageError as e:
+                    return jsonify({'success': False, 'message': str(e)}), 400
+        
+        # Car, locations, images and fuel details commit together
+        car_params['attachments'] = filename
+        with Database.transaction() as cursor:
+            car_id_var = cursor.var(int)
+            cursor.execute(sql('car.insert'), dict(car_params, car_id=car_id_var))
+            car_id = int(car_id_var.getvalue()[0])
+            
+            sync_car_locations(cursor, car_id, car_params['available_locations'])
+            if variants:
+                sync_car_images(cursor, car_id, variants)
+            save_fuel_details(cursor, car_id, car_params['fuel_type'], request.form, new=True)
         
+        filters_cache.invalidate()
+        stats_cache.invalidate()
         return jsonify({'success': True, 'message': 'Car created successfully', 'car_id': car_id})
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
@@ -676,126 +694,39 @@ def admin_update_car(car_id):
         return jsonify({'success': False, 'message': 'Unauthorized'}), 401
     
     try:
-        model_id = int(request.form.get('model_id'))
-        carType_id = int(request.form.get('carType_id'))
-        rate = float(request.form.get('rate'))
-        fuel_type = request.form.get('fuel_type')
-        description = request.form.get('description', '')
-        door = request.form.get('door')
-        suitcase = request.form.get('suitcase')
-        seat = request.form.get('seat')
-        colour = request.form.get('colour', '')
-        pickup_location = request.form.get('pickup_location', '')
-        dropoff_location = request.form.get('dropoff_location', '')
-        available_locations = request.form.get('available_locations', '')
-        allows_different_dropoff = 1 if request.form.get('allows_different_dropoff') == '1' else 0
-        
-        # Handle image upload
+        car_params = build_car_params(request.form)
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    try:
+        # Handle image upload: keep the original and write resized variants
         filename = None
+        variants = None
         if 'attachments' in request.files:
             file = request.files['attachments']
             if file and file.filename != '' and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                file.save(filepath)
-        
-        # Update car
-        car_params = {
-            'car_id': car_id,
-            'model_id': model_id,
-            'carType_id': carType_id,
-            'rate': rate,
-            'description': description if description else None,
-            'door': int(door) if door else None,
-            'suitcase': int(suitcase) if suitcase else None,
-            'seat': int(seat) if seat else None,
-            'colour': colour if colour else None,
-            'pickup_location': pickup_location if pickup_location else None,
-            'dropoff_location': dropoff_location if dropoff_location else None,
-            'available_locations': available_locations if available_locations else None,
-            'allows_different_dropoff': allows_different_dropoff
-        }
-        
-        if filename:
-            car_params['attachments'] = filename
-            car_query = """
-                UPDATE Car SET model_id = :model_id, carType_id = :carType_id, rate = :rate,
-                             description = :description, door = :door, suitcase = :suitcase, seat = :seat,
-                             colour = :colour, attachments = :attachments,
-                             pickup_location = :pickup_location, dropoff_location = :dropoff_location,
-                             available_locations = :available_locations, allows_different_dropoff = :allows_different_dropoff
-                WHERE car_id = :car_id
-            """
-        else:
-            car_query = """
-                UPDATE Car SET model_id = :model_id, carType_id = :carType_id, rate = :rate,
-                             description = :description, door = :door, suitcase = :suitcase, seat = :seat,
-                             colour = :colour,
-                             pickup_location = :pickup_location, dropoff_location = :dropoff_location,
-                             available_locations = :available_locations, allows_different_dropoff = :allows_different_dropoff
-                WHERE car_id = :car_id
-            """
-        
-        Database.execute_query(car_query, car_params, fetch=False)
-        
-        # Delete old fuel type records
-        Database.execute_query("DELETE FROM Petrol WHERE car_id = :car_id", {'car_id': car_id}, fetch=False)
-        Database.execute_query("DELETE FROM Diesel WHERE car_id = :car_id", {'car_id': car_id}, fetch=False)
-        Database.execute_query("DELETE FROM Electric WHERE car_id = :car_id", {'car_id': car_id}, fetch=False)
-        
-        # Insert new fuel type specific data
-        if fuel_type == 'Petrol':
-            octane_rating = request.form.get('octane_rating')
-            fuel_tank = request.form.get('fuel_tank_capacity')
-            if octane_rating or fuel_tank:
-                petrol_query = """
-                    INSERT INTO Petrol (car_id, octane_rating, fuel_tank_capacity)
-                    VALUES (:car_id, :octane_rating, :fuel_tank_capacity)
-                """
-                Database.execute_query(petrol_query, {
-                    'car_id': car_id,
-                    'octane_rating': int(octane_rating) if octane_rating else None,
-                    'fuel_tank_capacity': float(fuel_tank) if fuel_tank else None
-                }, fetch=False)
-        
-        elif fuel_type == 'Diesel':
-            diesel_emission = request.form.get('diesel_emission')
-            fuel_tank = request.form.get('fuel_tank_capacity')
-            if diesel_emission or fuel_tank:
-                diesel_query = """
-                    INSERT INTO Diesel (car_id, diesel_emission, fuel_tank_capacity)
-                    VALUES (:car_id, :diesel_emission, :fuel_tank_capacity)
-                """
-                Database.execute_query(diesel_query, {
-                    'car_id': car_id,
-                    'diesel_emission': diesel_emission if diesel_emission else None,
-                    'fuel_tank_capacity': float(fuel_tank) if fuel_tank else None
-                }, fetch=False)
-        
-        elif fuel_type == 'Electric':
-            battery_range = request.form.get('battery_range')
-            charging_rate = request.form.get('charging_rate_kw')
-            last_charging = request.form.get('last_charging_date')
-            if battery_range or charging_rate or last_charging:
-                if last_charging:
-                    electric_query = """
-                        INSERT INTO Electric (car_id, battery_range, charging_rate_kw, last_charging_date)
-                        VALUES (:car_id, :battery_range, :charging_rate_kw, TO_DATE(:last_charging_date, 'YYYY-MM-DD'))
-                    """
-                else:
-                    electric_query = """
-                        INSERT INTO Electric (car_id, battery_range, charging_rate_kw)
-                        VALUES (:car_id, :battery_range, :charging_rate_kw)
-                    """
-                electric_params = {
-                    'car_id': car_id,
-                    'battery_range': int(battery_range) if battery_range else None,
-                    'charging_rate_kw': float(charging_rate) if charging_rate else None
-                }
-                if last_charging:
-                    electric_params['last_charging_date'] = last_charging
-                Database.execute_query(electric_query, electric_params, fetch=False)
-        
+                try:
+                    filename, variants = process_car_image(file, app.config['UPLOAD_FOLDER'])
+                except InvalidImageError as e:
+                    return jsonify({'success': False, 'message': str(e)}), 400
+        
+        # Update the car and its subtables in one transaction
+        car_params['car_id'] = car_id
+        car_params['attachments'] = filename
+        with Database.transaction() as cursor:
+            cursor.execute(sql('car.update'), car_params)
+            if cursor.rowcount == 0:
+                return jsonify({'success': False, 'message': 'Car not found'}), 404
+            
+            sync_car_locations(cursor, car_id, car_params['available_locations'])
+            if variants:
+                sync_car_images(cursor, car_id, variants)
+            save_fuel_details(cursor, car_id, car_params['fuel_type'], request.form)
+        
+        filters_cache.invalidate()
+        stats_cache.invalidate()
+        rate_cards.invalidate(car_id)
+        car_cache.invalidate(car_id)
         return jsonify({'success': True, 'message': 'Car updated successfully'})
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
@@ -808,26 +739,196 @@ def admin_delete_car(car_id):
     
     try:
         # Check if car has bookings
-        booking_check = Database.execute_query(
-            "SELECT COUNT(*) as cnt FROM Booking WHERE car_id = :car_id",
-            {'car_id': car_id}
-        )
+        booking_check = Database.execute_query(sql('car.booking_count'), {'car_id': car_id})
         
         if booking_check and booking_check[0]['CNT'] > 0:
             return jsonify({'success': False, 'message': 'Cannot delete car with existing bookings'}), 400
         
-        # Delete fuel type records first (due to foreign keys)
-        Database.execute_query("DELETE FROM Petrol WHERE car_id = :car_id", {'car_id': car_id}, fetch=False)
-        Database.execute_query("DELETE FROM Diesel WHERE car_id = :car_id", {'car_id': car_id}, fetch=False)
-        Database.execute_query("DELETE FROM Electric WHERE car_id = :car_id", {'car_id': car_id}, fetch=False)
-        
-        # Delete car
-        Database.execute_query("DELETE FROM Car WHERE car_id = :car_id", {'car_id': car_id}, fetch=False)
+        # Delete child rows first (due to foreign keys), then the car, in one transaction
+        with Database.transaction() as cursor:
+            for child in ('petrol', 'diesel', 'electric', 'car_location', 'car_image'):
+                cursor.execute(sql(f'{child}.delete'), {'car_id': car_id})
+            cursor.execute(sql('car.delete'), {'car_id': car_id})
         
+        filters_cache.invalidate()
+        stats_cache.invalidate()
+        rate_cards.invalidate(car_id)
+        car_cache.invalidate(car_id)
         return jsonify({'success': True, 'message': 'Car deleted successfully'})
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
+# Admin: Bulk fleet import (CSV columns / JSON keys named like the car form fields)
+@app.route('/api/admin/cars/import', methods=['POST'])
+def admin_import_cars():
+    if 'user_id' not in session or session.get('user_type') != 'staff':
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 401
+    
+    try:
+        rows = read_import_rows()
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    if not rows:
+        return jsonify({'success': False, 'message': 'No cars to import'}), 400
+    if len(rows) > IMPORT_MAX_ROWS:
+        return jsonify({'success': False, 'message': f'At most {IMPORT_MAX_ROWS} cars per import'}), 400
+    
+    # Validate every row before writing anything
+    cars = []
+    errors = []
+    for number, row in enumerate(rows, start=1):
+        try:
+            params = build_car_params(row, form=False)
+            fuel_params(None, params['fuel_type'], row)
+            cars.append((params, row))
+        except (TypeError, ValueError) as e:
+            errors.append({'row': number, 'message': str(e)})
+    if errors:
+        return jsonify({
+            'success': False,
+            'message': f'{len(errors)} of {len(rows)} rows are invalid; nothing was imported',
+            'errors': errors[:50]
+        }), 400
+    
+    try:
+        # One transaction for the whole fleet, written in executemany batches
+        car_ids = []
+        with Database.transaction() as cursor:
+            for start in range(0, len(cars), IMPORT_BATCH_SIZE):
+                car_ids.extend(insert_car_batch(cursor, cars[start:start + IMPORT_BATCH_SIZE]))
+        
+        filters_cache.invalidate()
+        stats_cache.invalidate()
+        return jsonify({'success': True, 'message': f'Imported {len(car_ids)} cars', 'car_ids': car_ids})
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+# Admin: Dashboard statistics
+@app.route('/api/admin/stats', methods=['GET'])
+def admin_stats():
+    if 'user_id' not in session or session.get('user_type') != 'staff':
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 401
+    
+    try:
+        window_days = min(max(int(request.args.get('days', 30)), 1), 366)
+        months = min(max(int(request.args.get('months', 12)), 1), 36)
+        top = min(max(int(request.args.get('top', 10)), 1), STATS_TOP_MAX)
+    except ValueError:
+        return jsonify({'success': False, 'message': 'days, months and top must be numbers'}), 400
+    
+    try:
+        key = (window_days, months, top)
+        stats = stats_cache.get(key)
+        if stats is None:
+            stats = fleet_stats(window_days, months, top)
+            stats_cache.set(key, stats)
+        return jsonify({'success': True, **stats})
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+# Admin: Utilization of every car, a page at a time
+@app.route('/api/admin/stats/cars', methods=['GET'])
+def admin_stats_cars():
+    if 'user_id' not in session or session.get('user_type') != 'staff':
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 401
+    
+    try:
+        window_days = min(max(int(request.args.get('days', 30)), 1), 366)
+        offset = max(int(request.args.get('offset', 0)), 0)
+        limit = min(max(int(request.args.get('limit', 50)), 1), STATS_PAGE_MAX)
+    except ValueError:
+        return jsonify({'success': False, 'message': 'days, offset and limit must be numbers'}), 400
+    
+    try:
+        key = ('cars', window_days, offset, limit)
+        page = stats_cache.get(key)
+        if page is None:
+            page = car_utilization(window_days, offset, limit)
+            stats_cache.set(key, page)
+        return jsonify({'success': True, **page})
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+# Admin: In-process and shared cache counters
+@app.route('/api/admin/caches', methods=['GET'])
+def admin_caches():
+    if 'user_id' not in session or session.get('user_type') != 'staff':
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 401
+    
+    return jsonify({
+        'success': True,
+        'caches': {
+            'car_detail': car_cache.stats(),
+            'rates': rate_cards.stats(),
+            'filters': filters_cache.stats(),
+            'stats': stats_cache.stats()
+        }
+    })
+
+# Admin: Database pool statistics
+@app.route('/api/admin/pool-stats', methods=['GET'])
+def admin_pool_stats():
+    if 'user_id' not in session or session.get('user_type') != 'staff':
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 401
+    
+    return jsonify({'success': True, 'pool': Database.pool_stats()})
+
+# Admin: Per-statement SQL timings
+@app.route('/api/admin/metrics', methods=['GET'])
+def admin_metrics():
+    if 'user_id' not in session or session.get('user_type') != 'staff':
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 401
+    
+    statements = metrics.statement_stats.snapshot()
+    if request.args.get('reset') == '1':
+        metrics.statement_stats.reset()
+    return jsonify({
+        'success': True,
+        'statements': statements,
+        'buckets_ms': list(metrics.BUCKETS_MS),
+        'pool': Database.pool_stats()
+    })
+
+# Admin: Statement cache effectiveness
+@app.route('/api/admin/statement-cache', methods=['GET'])
+def admin_statement_cache():
+    if 'user_id' not in session or session.get('user_type') != 'staff':
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 401
+
+    statements = metrics.statement_cache.snapshot()
+    if request.args.get('reset') == '1':
+        metrics.statement_cache.reset()
+    executions = sum(stat['executions'] for stat in statements)
+    hits = sum(stat['hits'] for stat in statements)
+    for stat in statements:
+        name = statement_name(stat['sql'])
+        stat['name'] = name
+        stat['registered'] = name is not None
+        stat['sql'] = metrics.normalize_sql(stat['sql'])
+    return jsonify({
+        'success': True,
+        'stmt_cache_size': DB_CONFIG['stmt_cache_size'],
+        'executions': executions,
+        'estimated_hits': hits,
+        'estimated_hit_ratio': round(hits / executions, 3) if executions else None,
+        'distinct_statements': len(statements),
+        'server': Database.parse_stats(),
+        'statements': statements
+    })
+
+# Admin: Staff workload table used to assign bookings
+@app.route('/api/admin/staff-load', methods=['GET'])
+def admin_staff_load():
+    if 'user_id' not in session or session.get('user_type') != 'staff':
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 401
+    
+    try:
+        if request.args.get('refresh') == '1':
+            staff_load.refresh()
+        return jsonify({'success': True, **staff_load.stats()})
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
 # Get models by brand
 @app.route('/api/models', methods=['GET'])
 def get_models():
@@ -836,8 +937,7 @@ def get_models():
         return jsonify({'success': False, 'message': 'brand_id required'}), 400
     
     try:
-        query = "SELECT model_id, model_name FROM Model WHERE brand_id = :brand_id ORDER BY model_name"
-        models = Database.execute_query(query, {'brand_id': int(brand_id)})
+        models = Database.execute_query(sql('models.by_brand'), {'brand_id': int(brand_id)})
         return jsonify({'success': True, 'models': models})
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
@@ -854,8 +954,8 @@ def admin_add_brand():
         if not brand_name:
             return jsonify({'success': False, 'message': 'Brand name required'}), 400
         
-        query = "INSERT INTO Brand (brand_name) VALUES (:brand_name)"
-        Database.execute_query(query, {'brand_name': brand_name}, fetch=False)
+        Database.execute_query(sql('brand.insert'), {'brand_name': brand_name}, fetch=False)
+        filters_cache.invalidate()
         return jsonify({'success': True, 'message': 'Brand added successfully'})
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
@@ -873,8 +973,8 @@ def admin_add_model():
         if not model_name or not brand_id:
             return jsonify({'success': False, 'message': 'Model name and brand_id required'}), 400
         
-        query = "INSERT INTO Model (model_name, brand_id) VALUES (:model_name, :brand_id)"
-        Database.execute_query(query, {'model_name': model_name, 'brand_id': int(brand_id)}, fetch=False)
+        Database.execute_query(sql('model.insert'), {'model_name': model_name, 'brand_id': int(brand_id)}, fetch=False)
+        filters_cache.invalidate()
         return jsonify({'success': True, 'message': 'Model added successfully'})
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
@@ -883,7 +983,10 @@ def admin_add_model():
 
 @app.route('/uploads/<filename>')
 def uploaded_file(filename):
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+    # send_from_directory answers conditional (ETag/Last-Modified) and Range requests
+    if is_content_hashed(filename):
+        return assets.immutable(send_from_directory(app.config['UPLOAD_FOLDER'], filename, max_age=STATIC_MAX_AGE))
+    return send_from_directory(app.config['UPLOAD_FOLDER'], filename, max_age=UPLOAD_MAX_AGE)
 
 @app.route('/api/upload-car-image', methods=['POST'])
 def upload_car_image():
@@ -904,26 +1007,64 @@ def upload_car_image():
         return jsonify({'success': False, 'message': 'No file selected'}), 400
     
     if file and allowed_file(file.filename):
-        filename = secure_filename(f"car_{car_id}_{file.filename}")
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        try:
+            filename, variants = process_car_image(file, app.config['UPLOAD_FOLDER'])
+        except InvalidImageError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
         
-        # Update database
+        # Update database. Files are content-addressed and may be shared with
+        # other cars, so they are left in place if this fails.
         try:
-            update_query = "UPDATE Car SET attachments = :filename WHERE car_id = :car_id"
-            Database.execute_query(update_query, {
+            with Database.transaction() as cursor:
+                cursor.execute(sql('car.set_attachment'), {
+                    'filename': filename,
+                    'car_id': int(car_id)
+                })
+                sync_car_images(cursor, int(car_id), variants)
+            car_cache.invalidate(int(car_id))
+            return jsonify({
+                'success': True,
+                'message': 'Image uploaded successfully',
                 'filename': filename,
-                'car_id': int(car_id)
-            }, fetch=False)
-            return jsonify({'success': True, 'message': 'Image uploaded successfully', 'filename': filename})
+                'variants': {name: variant[0] for name, variant in variants.items()}
+            })
         except Exception as e:
-            # Delete file if database update fails
-            if os.path.exists(filepath):
-                os.remove(filepath)
             return jsonify({'success': False, 'message': str(e)}), 500
     
     return jsonify({'success': False, 'message': 'Invalid file type'}), 400
 
+# ==================== HEALTH ROUTES ====================
+
+# Liveness: the worker process is up and answering
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    return jsonify({'success': True, 'pid': os.getpid()})
+
+# Readiness: this worker can reach the database through its own pool
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    try:
+        Database.ping()
+    except Exception as e:
+        logger.warning(f"Readiness check failed: {e}")
+        return jsonify({'success': False, 'ready': False, 'pid': os.getpid(), 'message': str(e)}), 503
+    return jsonify({'success': True, 'ready': True, 'pid': os.getpid(), 'pool': Database.pool_stats()})
+
+# ==================== CLI ====================
+
+@app.cli.command('hash-passwords')
+def hash_passwords_command():
+    """Hash every password still stored in plaintext"""
+    for user_type in ('customer', 'staff'):
+        rows = [row for row in Database.execute_query(sql(f'{user_type}.passwords')) if not is_hashed(row['PASSWORD_HASH'])]
+        if rows:
+            hashes = hash_passwords([row['PASSWORD_HASH'] for row in rows])
+            Database.execute_many(sql(f'{user_type}.set_password'), [
+                {'password_hash': password_hash, 'user_id': row['USER_ID']}
+                for row, password_hash in zip(rows, hashes)
+            ])
+        click.echo(f"{user_type}: hashed {len(rows)} plaintext passwords")
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
 
@@ -0,0 +1,187 @@
+"""ASGI deployment of the app
+
+    uvicorn asgi:app --host 0.0.0.0 --port 8000 --workers 4
+
+The read-heavy routes (/api/cars, /api/car/<id>, /api/filters and
+/api/my-bookings) run as coroutines on db_async's asyncio session pool, so a
+worker keeps many queries in flight instead of one per thread. They share
+request parsing, statements and response shaping with the Flask handlers
+through queries.py. Every other path is handed to the Flask app unchanged,
+so logins, sessions, pages and admin routes behave exactly as under WSGI.
+"""
+from config import JSON_GZIP_MIN_BYTES, JSON_GZIP_LEVEL
+from starlette.applications import Starlette
+from starlette.middleware.wsgi import WSGIMiddleware
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+from itsdangerous import BadSignature
+from app import app as flask_app, filters_cache, car_cache
+from db_async import AsyncDatabase
+from json_provider import dumps_bytes
+from statements import sql
+from contextlib import asynccontextmanager
+from email.utils import format_datetime, parsedate_to_datetime
+import asyncio
+import gzip
+import queries
+
+# Flask's session cookie and upload URLs, readable outside a Flask request
+_session_serializer = flask_app.session_interface.get_signing_serializer(flask_app)
+_urls = flask_app.url_map.bind('')
+
+def flask_session(request):
+    """Decode the Flask session cookie sent with an ASGI request"""
+    cookie = request.cookies.get(flask_app.config['SESSION_COOKIE_NAME'])
+    if not cookie:
+        return {}
+    try:
+        max_age = int(flask_app.permanent_session_lifetime.total_seconds())
+        return _session_serializer.loads(cookie, max_age=max_age)
+    except BadSignature:
+        return {}
+
+def add_image_url(car):
+    """Set IMAGE_URL like app.add_image_url, without a Flask request context"""
+    filename = car.pop('IMAGE_FILE', None) or car.get('ATTACHMENTS')
+    car['IMAGE_URL'] = _urls.build('uploaded_file', {'filename': filename}) if filename else None
+
+def json_response(request, payload, status=200, headers=None):
+    """JSON response encoded and gzip-negotiated the same way as json_provider does for Flask"""
+    body = dumps_bytes(payload)
+    headers = dict(headers or {})
+    if status == 200:
+        headers['Vary'] = 'Accept-Encoding'
+        if len(body) >= JSON_GZIP_MIN_BYTES and 'gzip' in request.headers.get('accept-encoding', ''):
+            body = gzip.compress(body, compresslevel=JSON_GZIP_LEVEL, mtime=0)
+            headers['Content-Encoding'] = 'gzip'
+            if 'ETag' in headers and not headers['ETag'].startswith('W/'):
+                headers['ETag'] = 'W/' + headers['ETag']
+    return Response(body, status_code=status, media_type='application/json', headers=headers)
+
+def error_response(request, message, status):
+    return json_response(request, {'success': False, 'message': message}, status)
+
+def not_modified(request, etag, last_modified):
+    """Conditional GET check matching werkzeug's make_conditional"""
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match:
+        tags = [tag.strip().removeprefix('W/').strip('"') for tag in if_none_match.split(',')]
+        return etag in tags or '*' in tags
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since:
+        try:
+            return parsedate_to_datetime(if_modified_since) >= last_modified
+        except (TypeError, ValueError):
+            return False
+    return False
+
+# ==================== ASYNC API ROUTES ====================
+
+async def get_cars(request):
+    try:
+        try:
+            count, (query, params), limit = queries.cars_queries(request.query_params)
+        except queries.InvalidQuery as e:
+            return error_response(request, str(e), 400)
+
+        # The COUNT and the page run concurrently on two pooled sessions
+        listing = AsyncDatabase.execute_query(query, params, json_ready=True)
+        total = None
+        if count is not None:
+            count_rows, cars = await asyncio.gather(AsyncDatabase.execute_query(*count), listing)
+            total = int(count_rows[0]['CNT'])
+        else:
+            cars = await listing
+        return json_response(request, queries.cars_response(cars, limit, total, add_image_url))
+    except Exception as e:
+        return error_response(request, str(e), 500)
+
+async def cache_call(method, *args):
+    """Call a car_cache method, off the event loop when the cache is a network round trip"""
+    if car_cache.shared:
+        return await asyncio.to_thread(method, *args)
+    return method(*args)
+
+async def get_car(request):
+    car_id = request.path_params['car_id']
+    try:
+        # Same read-through cache as app.load_car, so Flask's admin writes invalidate it
+        car = await cache_call(car_cache.get, car_id)
+        if car is None:
+            result = await AsyncDatabase.execute_query(sql('car.detail'), {'car_id': car_id}, json_ready=True)
+            if result:
+                car = result[0]
+                add_image_url(car)
+                await cache_call(car_cache.set, car_id, car)
+
+        if car:
+            return json_response(request, {'success': True, 'car': car})
+        else:
+            return error_response(request, 'Car not found', 404)
+    except Exception as e:
+        return error_response(request, str(e), 500)
+
+async def load_filters():
+    """Run the filter option queries concurrently"""
+    results = await asyncio.gather(*(AsyncDatabase.execute_query(sql(name)) for name in queries.FILTER_QUERIES))
+    return queries.filters_payload(*results)
+
+async def get_filters(request):
+    try:
+        # Same cache as the Flask route, so admin changes served by Flask invalidate it
+        cached = filters_cache.get('filters')
+        if cached is None:
+            cached = queries.filters_entry(await load_filters())
+            filters_cache.set('filters', cached)
+
+        headers = {
+            'ETag': f'"{cached["etag"]}"',
+            'Last-Modified': format_datetime(cached['last_modified'], usegmt=True),
+            # Let browsers keep the payload but revalidate it on every page load
+            'Cache-Control': 'no-cache'
+        }
+        if not_modified(request, cached['etag'], cached['last_modified']):
+            return Response(status_code=304, headers=headers)
+        return json_response(request, {'success': True, **cached['filters']}, headers=headers)
+    except Exception as e:
+        return error_response(request, str(e), 500)
+
+async def get_my_bookings(request):
+    session = flask_session(request)
+    if 'user_id' not in session:
+        return error_response(request, 'Please login', 401)
+
+    try:
+        try:
+            count, (query, params), limit = queries.my_bookings_queries(
+                session.get('user_type'), session['user_id'], request.query_params)
+        except queries.InvalidQuery as e:
+            return error_response(request, str(e), 400)
+
+        listing = AsyncDatabase.execute_query(query, params, json_ready=True)
+        total = None
+        if count is not None:
+            count_rows, bookings = await asyncio.gather(AsyncDatabase.execute_query(*count), listing)
+            total = int(count_rows[0]['CNT'])
+        else:
+            bookings = await listing
+        return json_response(request, queries.bookings_response(bookings, limit, total))
+    except Exception as e:
+        return error_response(request, str(e), 500)
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    await AsyncDatabase.close_pool()
+
+app = Starlette(
+    routes=[
+        Route('/api/cars', get_cars, methods=['GET']),
+        Route('/api/car/{car_id:int}', get_car, methods=['GET']),
+        Route('/api/filters', get_filters, methods=['GET']),
+        Route('/api/my-bookings', get_my_bookings, methods=['GET']),
+        # Everything else: the Flask app, run in Starlette's WSGI thread pool
+        Mount('/', app=WSGIMiddleware(flask_app)),
+    ],
+    lifespan=lifespan
+)
@@ -0,0 +1,107 @@
+from config import STATIC_MAX_AGE, ASSET_PRECOMPRESS
+from flask import request, send_from_directory, url_for, abort, current_app
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Static files that get fingerprinted URLs (uploads are content-hashed on their own)
+ASSET_EXTENSIONS = {'.css', '.js', '.svg', '.png', '.jpg', '.jpeg', '.gif', '.webp', '.ico', '.woff', '.woff2'}
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.svg'}
+
+class AssetManifest:
+    """Maps static files to content-hashed names, e.g. css/style.css -> css/style.3f2a9c1b7d4e.css"""
+
+    def __init__(self, static_folder, exclude=()):
+        self.static_folder = static_folder
+        self.exclude = tuple(os.path.abspath(path) for path in exclude)
+        self.hashed = {}
+        self.files = {}
+
+    def build(self):
+        """Hash every asset under the static folder (run once at startup)"""
+        hashed, files = {}, {}
+        for root, dirs, filenames in os.walk(self.static_folder):
+            dirs[:] = [d for d in dirs if os.path.abspath(os.path.join(root, d)) not in self.exclude]
+            for name in filenames:
+                stem, ext = os.path.splitext(name)
+                if ext.lower() not in ASSET_EXTENSIONS:
+                    continue
+                path = os.path.join(root, name)
+                with open(path, 'rb') as f:
+                    data = f.read()
+                digest = hashlib.sha256(data).hexdigest()[:12]
+                logical = os.path.relpath(path, self.static_folder).replace(os.sep, '/')
+                fingerprinted = f'{logical[:-len(name)]}{stem}.{digest}{ext}'
+                hashed[logical] = fingerprinted
+                files[fingerprinted] = {
+                    'path': logical,
+                    'etag': digest,
+                    'mimetype': mimetypes.guess_type(name)[0] or 'application/octet-stream',
+                    'encoded': self._precompress(data) if ext.lower() in COMPRESSIBLE_EXTENSIONS else {}
+                }
+        self.hashed, self.files = hashed, files
+        logger.info(f"Asset manifest built: {len(hashed)} files")
+        return self
+
+    @staticmethod
+    def _precompress(data):
+        """Compressed copies of a text asset, keyed by Content-Encoding"""
+        if not ASSET_PRECOMPRESS:
+            return {}
+        encoded = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            encoded['br'] = brotli.compress(data)
+        # Tiny files can grow when compressed
+        return {encoding: body for encoding, body in encoded.items() if len(body) < len(data)}
+
+    def url(self, filename):
+        """URL for a static file, fingerprinted when it is in the manifest"""
+        fingerprinted = self.hashed.get(filename)
+        if fingerprinted is None:
+            return url_for('static', filename=filename)
+        return url_for('hashed_asset', filename=fingerprinted)
+
+def immutable(response):
+    """Let browsers and proxies keep a content-addressed response for STATIC_MAX_AGE"""
+    response.headers['Cache-Control'] = f'public, max-age={STATIC_MAX_AGE}, immutable'
+    return response
+
+def init_app(app, exclude=()):
+    """Build the asset manifest and expose asset_url() to templates"""
+    manifest = AssetManifest(app.static_folder, exclude).build()
+    app.extensions['asset_manifest'] = manifest
+    app.add_template_global(manifest.url, name='asset_url')
+
+    @app.route('/assets/<path:filename>')
+    def hashed_asset(filename):
+        entry = manifest.files.get(filename)
+        if entry is None:
+            abort(404)
+
+        # Serve a precompressed copy when the client accepts one (brotli first)
+        for encoding in ('br', 'gzip'):
+            body = entry['encoded'].get(encoding)
+            if body is not None and request.accept_encodings[encoding]:
+                response = current_app.response_class(body, mimetype=entry['mimetype'])
+                response.headers['Content-Encoding'] = encoding
+                response.set_etag(f"{entry['etag']}-{encoding}")
+                response.make_conditional(request)
+                break
+        else:
+            # send_file handles If-None-Match and Range requests itself
+            response = send_from_directory(app.static_folder, entry['path'], etag=entry['etag'])
+
+        if entry['encoded']:
+            response.vary.add('Accept-Encoding')
+        return immutable(response)
+
+    return manifest
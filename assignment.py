@@ -0,0 +1,98 @@
+from config import STAFF_LOAD_TTL
+from db import Database
+from statements import sql
+from datetime import datetime
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class StaffLoad:
+    """In-process table of open bookings per staff member, for assigning new bookings
+
+    The table is loaded from Booking in one query and then kept current by
+    assign(), which counts each booking it hands out, so picking a staff member
+    costs no round trip. It is reloaded once it is older than the TTL, which
+    also picks up bookings that have ended, staff changes and bookings made
+    by other worker processes.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._staff = {}  # staff_id -> branch key (None: serves every branch)
+        self._load = {}  # staff_id -> open bookings
+        self._loaded_at = None
+        self._generation = 0  # bumped by every refresh
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self.assigned = 0
+        self.refreshes = 0
+
+    def refresh(self):
+        """Reload staff and their open booking counts from the database"""
+        rows = Database.execute_query(sql('staff.load'), {'today': datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)})
+        staff = {int(row['STAFF_ID']): (row['STAFF_BRANCH'] or '').strip().upper() or None for row in rows}
+        load = {int(row['STAFF_ID']): int(row['OPEN_BOOKINGS']) for row in rows}
+        with self._lock:
+            self._staff, self._load = staff, load
+            self._loaded_at = time.monotonic()
+            self._generation += 1
+            self.refreshes += 1
+        logger.info(f"Staff load table refreshed ({len(staff)} staff)")
+
+    def _ensure_fresh(self):
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl:
+            return
+        # One thread reloads; the others keep assigning from the current table,
+        # unless there is none yet
+        if self._refresh_lock.acquire(blocking=self._loaded_at is None):
+            try:
+                if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.ttl:
+                    self.refresh()
+            finally:
+                self._refresh_lock.release()
+
+    def assign(self, location):
+        """Pick the least-loaded staff member for a pickup location and count the booking against them
+
+        Staff of the location's branch are preferred, then staff without a
+        branch, then anyone. Returns (staff_id, generation) for release(), or
+        (None, None) when there are no staff.
+        """
+        self._ensure_fresh()
+        key = (location or '').strip().upper()
+        with self._lock:
+            candidates = ([s for s, branch in self._staff.items() if branch == key]
+                          or [s for s, branch in self._staff.items() if branch is None]
+                          or list(self._staff))
+            if not candidates:
+                return None, None
+            staff_id = min(candidates, key=lambda s: (self._load[s], s))
+            self._load[staff_id] += 1
+            self.assigned += 1
+            return staff_id, self._generation
+
+    def release(self, staff_id, generation):
+        """Undo an assign() whose booking was not saved
+
+        A refresh since the assign rebuilt the counts from Booking, which
+        never saw the booking, so there is nothing left to undo.
+        """
+        with self._lock:
+            if generation == self._generation and staff_id in self._load:
+                self._load[staff_id] -= 1
+                self.assigned -= 1
+
+    def stats(self):
+        """Return the table with its age and counters"""
+        with self._lock:
+            return {
+                'staff': [{'staff_id': s, 'branch': self._staff[s], 'open_bookings': self._load[s]} for s in sorted(self._staff)],
+                'age_s': round(time.monotonic() - self._loaded_at, 1) if self._loaded_at is not None else None,
+                'ttl': self.ttl,
+                'assigned': self.assigned,
+                'refreshes': self.refreshes
+            }
+
+staff_load = StaffLoad(ttl=STAFF_LOAD_TTL)
@@ -0,0 +1,206 @@
+"""Throughput of the sync (WSGI) and async (ASGI) deployments at high concurrency.
+
+Starts the Flask app and asgi.py as two uvicorn servers on the same database,
+then holds N keep-alive connections open against each and sends the read-heavy
+/api routes for a fixed time per concurrency level. Prints requests/second,
+latency percentiles and error counts per server and level as JSON.
+
+The sync server runs the Flask app through uvicorn's WSGI interface, whose
+thread pool caps it at a fixed number of requests in flight, like a threaded
+WSGI worker. The async server runs the same routes as coroutines.
+
+    python bench/asgi_bench.py --scale 2000 --concurrency 16,64,256 --duration 10
+    DB_BACKEND=oracle python bench/asgi_bench.py --concurrency 64,512
+
+By default both servers share a fresh SQLite stand-in built like
+bench/http_bench.py. sqlite3 has no asyncio driver, so there the async
+server runs statements in threads too; with DB_BACKEND=oracle it uses
+python-oracledb's asyncio pool, where the difference is largest because
+every query is a network round trip.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'bench'))
+
+if os.environ.get('DB_BACKEND', 'sqlite') == 'sqlite':
+    # Points DB_SQLITE_PATH at a new temporary file (see http_bench)
+    import http_bench  # noqa: E402,F401
+
+from app import app  # noqa: E402
+
+LOCATIONS = ['Kuala Lumpur', 'Penang', 'Ipoh', 'Melaka', 'Johor Bahru']
+
+SERVERS = {
+    'sync': ['--interface', 'wsgi', 'app:app'],
+    'async': ['asgi:app'],
+}
+
+
+def request_paths(scale, first_car):
+    """Weighted mix of read requests: listing, detail, filters and bookings"""
+    def pick(rng):
+        roll = rng.random()
+        if roll < 0.4:
+            return rng.choice([
+                '/api/cars?limit=24',
+                f'/api/cars?location={rng.choice(LOCATIONS).replace(" ", "%20")}&limit=24',
+                '/api/cars?fuel_type=Petrol&seats=5&limit=24',
+                '/api/cars?min_price=100&max_price=300&limit=24&include_total=1',
+            ])
+        if roll < 0.75:
+            return f'/api/car/{first_car + rng.randrange(scale)}'
+        if roll < 0.9:
+            return '/api/filters'
+        return '/api/my-bookings'
+    return pick
+
+
+# ==================== HTTP CLIENT ====================
+
+async def send(reader, writer, path, cookie):
+    """Send one keep-alive GET and read the whole response; return the status code"""
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: bench\r\nCookie: {cookie}\r\n\r\n'.encode())
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, value = line.decode('latin-1').split(':', 1)
+        headers[name.strip().lower()] = value.strip()
+    if 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    elif headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    return status
+
+
+async def load(port, concurrency, duration, pick, cookie, seed):
+    """Keep `concurrency` connections busy for `duration` seconds"""
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def connection(index):
+        nonlocal errors
+        rng = random.Random(seed + index)
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        try:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    status = await send(reader, writer, pick(rng), cookie)
+                except (ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+                    errors += 1
+                    writer.close()
+                    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                    continue
+                latencies.append((time.perf_counter() - start) * 1000)
+                if status != 200:
+                    errors += 1
+        finally:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(connection(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    def pct(p):
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 2) if latencies else None
+
+    return {
+        'requests': len(latencies),
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': pct(0.50),
+        'p95_ms': pct(0.95),
+        'p99_ms': pct(0.99),
+        'mean_ms': round(statistics.fmean(latencies), 2) if latencies else None,
+        'errors': errors,
+    }
+
+
+# ==================== SERVERS ====================
+
+def start_server(kind, port, workers):
+    command = [sys.executable, '-m', 'uvicorn', '--port', str(port), '--workers', str(workers),
+               '--log-level', 'warning', '--no-access-log'] + SERVERS[kind]
+    return subprocess.Popen(command, cwd=ROOT, env=os.environ.copy())
+
+
+async def wait_ready(port, timeout=30):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            status = await send(reader, writer, '/api/filters', '')
+            writer.close()
+            if status == 200:
+                return
+        except OSError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f'Server on port {port} did not become ready')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, default=2000, help='cars, customers and bookings to generate (SQLite only)')
+    parser.add_argument('--concurrency', default='16,64,256', help='comma-separated connection counts')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per server and level')
+    parser.add_argument('--workers', type=int, default=1, help='uvicorn worker processes per server')
+    parser.add_argument('--servers', default='sync,async')
+    parser.add_argument('--port', type=int, default=8700)
+    parser.add_argument('--output', help='write the JSON report to this file')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    if os.environ.get('DB_BACKEND', 'sqlite') == 'sqlite':
+        ids = http_bench.generate(args.scale, args.seed)
+        scale, first_car, cust_id = args.scale, ids['first_car'], ids['first_cust']
+    else:
+        scale, first_car, cust_id = 10, 1, 1
+    # A signed customer session, so /api/my-bookings is served rather than rejected
+    cookie = f"{app.config['SESSION_COOKIE_NAME']}=" + app.session_interface.get_signing_serializer(app).dumps(
+        {'user_id': cust_id, 'user_type': 'customer'})
+    pick = request_paths(scale, first_car)
+
+    report = {'scale': scale, 'duration_s': args.duration, 'workers': args.workers,
+              'backend': os.environ.get('DB_BACKEND', 'sqlite'), 'results': {}}
+    for offset, kind in enumerate(args.servers.split(',')):
+        port = args.port + offset
+        server = start_server(kind, port, args.workers)
+        try:
+            asyncio.run(wait_ready(port))
+            report['results'][kind] = {}
+            for concurrency in (int(c) for c in args.concurrency.split(',')):
+                result = asyncio.run(load(port, concurrency, args.duration, pick, cookie, args.seed))
+                report['results'][kind][concurrency] = result
+                print(f'{kind:>5} c={concurrency:<4} {result}', file=sys.stderr)
+        finally:
+            server.terminate()
+            server.wait()
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+
+
+if __name__ == '__main__':
+    main()
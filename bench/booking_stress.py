@@ -0,0 +1,105 @@
+"""Concurrency stress check for POST /api/bookings.
+
+Many threads try to book the same car for random, heavily overlapping date
+ranges at once. Afterwards every accepted booking for that car is compared
+pairwise; the run fails if any two overlap. Bookings created by the run are
+deleted again at the end.
+
+    python bench/booking_stress.py --car-id 1 --threads 16 --attempts 25
+
+Set DB_BACKEND=sqlite to run it against the local SQLite stand-in.
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app  # noqa: E402
+from db import Database  # noqa: E402
+
+
+def worker(car_id, cust_id, attempts, start, results, seed):
+    rng = random.Random(seed)
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = cust_id
+        sess['user_type'] = 'customer'
+    for _ in range(attempts):
+        pickup = start + timedelta(days=rng.randint(0, 30))
+        dropoff = pickup + timedelta(days=rng.randint(0, 4))
+        response = client.post('/api/bookings', json={
+            'car_id': car_id,
+            'pickup_date': pickup.isoformat(),
+            'dropoff_date': dropoff.isoformat(),
+            'pickup_location': 'Stress Test',
+            'dropoff_location': 'Stress Test'
+        })
+        results.append((response.status_code, response.get_json()))
+
+
+def find_overlaps(bookings):
+    overlaps = []
+    ordered = sorted(bookings, key=lambda b: (b['PICKUP_DATE'], b['DROPOFF_DATE']))
+    for prev, cur in zip(ordered, ordered[1:]):
+        if cur['PICKUP_DATE'] <= prev['DROPOFF_DATE']:
+            overlaps.append((prev['BOOKING_ID'], cur['BOOKING_ID']))
+    return overlaps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--car-id', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--attempts', type=int, default=25, help='bookings attempted per thread')
+    parser.add_argument('--keep', action='store_true', help='keep the bookings created by the run')
+    args = parser.parse_args()
+
+    with app.app_context():
+        customer = Database.execute_query("SELECT MIN(cust_id) as cust_id FROM Customer")
+        cust_id = customer[0]['CUST_ID'] if customer else None
+        if cust_id is None:
+            sys.exit('No customer rows to book with')
+        # Start far enough in the future not to collide with real bookings
+        latest = Database.execute_query(
+            "SELECT MAX(dropoff_date) as latest FROM Booking WHERE car_id = :car_id", {'car_id': args.car_id}
+        )[0]['LATEST']
+    start = max(date.today(), latest.date() if hasattr(latest, 'date') else date.today()) + timedelta(days=365)
+
+    results = []
+    threads = [
+        threading.Thread(target=worker, args=(args.car_id, int(cust_id), args.attempts, start, results, i))
+        for i in range(args.threads)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    created = [body['booking_id'] for status, body in results if status == 200 and body.get('success')]
+    rejected = sum(1 for status, _ in results if status == 400)
+    errors = [body for status, body in results if status not in (200, 400)]
+
+    with app.app_context():
+        bookings = Database.execute_query(
+            "SELECT booking_id, pickup_date, dropoff_date FROM Booking WHERE car_id = :car_id AND pickup_date >= :start",
+            {'car_id': args.car_id, 'start': start}
+        )
+        overlaps = find_overlaps(bookings)
+        if created and not args.keep:
+            Database.execute_many("DELETE FROM Booking WHERE booking_id = :booking_id",
+                                  [{'booking_id': b} for b in created])
+
+    print(f"attempts={len(results)} created={len(created)} rejected={rejected} errors={len(errors)} overlaps={len(overlaps)}")
+    for body in errors[:5]:
+        print(f"  error: {body}")
+    for pair in overlaps[:10]:
+        print(f"  overlapping bookings: {pair}")
+    sys.exit(1 if overlaps or errors else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,299 @@
+"""HTTP benchmark for the /api routes on a synthetic fleet.
+
+Builds a fresh SQLite stand-in database, fills it with a synthetic fleet,
+customers and bookings at the requested scale, then drives every API route
+through the Flask test client from several threads. Prints per-route latency
+percentiles, throughput and SQL statements per request as JSON.
+
+    python bench/http_bench.py --scale 1000 --concurrency 8 --requests 200
+    python bench/http_bench.py --scale 100000 --routes cars,car,filters --output bench.json
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The benchmark always runs on its own SQLite file, never on a shared database
+_db_file = tempfile.NamedTemporaryFile(prefix='carola-bench-', suffix='.sqlite3', delete=False)
+_db_file.close()
+os.remove(_db_file.name)
+os.environ['DB_BACKEND'] = 'sqlite'
+os.environ['DB_SQLITE_PATH'] = _db_file.name
+
+import db  # noqa: E402
+from app import app  # noqa: E402
+from db import Database  # noqa: E402
+
+COLOURS = ['White', 'Black', 'Silver', 'Grey', 'Red', 'Blue']
+LOCATIONS = ['Kuala Lumpur', 'Selangor', 'Putrajaya', 'Cyberjaya', 'Penang', 'Johor Bahru',
+             'Melaka', 'Ipoh', 'Perak', 'Kedah', 'Kuantan', 'Kota Kinabalu', 'Kuching']
+FUELS = ['Petrol', 'Diesel', 'Electric']
+EPOCH = datetime(2024, 1, 1)
+
+
+# ==================== STATEMENT COUNTING ====================
+
+_counter = threading.local()
+_original_execute = db.SQLiteCursor.execute
+_original_executemany = db.SQLiteCursor.executemany
+
+# Pool health checks and readiness pings are not work done for the request
+_HEALTH_CHECK = re.compile(r'\s*SELECT\s+1(\s+AS\s+\w+)?(\s+FROM\s+dual)?\s*$', re.I)
+
+
+def _counting_execute(self, sql, params=()):
+    if not _HEALTH_CHECK.match(sql):
+        _counter.count = getattr(_counter, 'count', 0) + 1
+    return _original_execute(self, sql, params)
+
+
+def _counting_executemany(self, sql, seq_of_params):
+    _counter.count = getattr(_counter, 'count', 0) + 1
+    return _original_executemany(self, sql, seq_of_params)
+
+
+db.SQLiteCursor.execute = _counting_execute
+db.SQLiteCursor.executemany = _counting_executemany
+
+
+# ==================== DATA GENERATION ====================
+
+def generate(scale, seed=42):
+    """Load `scale` cars, `scale` customers and `scale` bookings into the stand-in"""
+    rng = random.Random(seed)
+    conn = Database.backend().connect()
+    try:
+        models = [row[0] for row in conn.execute('SELECT model_id FROM Model')]
+        types = [row[0] for row in conn.execute('SELECT carType_id FROM CarType')]
+        first_car = conn.execute('SELECT COALESCE(MAX(car_id), 0) + 1 FROM Car').fetchone()[0]
+        first_cust = conn.execute('SELECT COALESCE(MAX(cust_id), 0) + 1 FROM Customer').fetchone()[0]
+        staff_ids = [row[0] for row in conn.execute('SELECT staff_id FROM Staff')]
+
+        cars, locations, petrol, diesel, electric = [], [], [], [], []
+        for i in range(scale):
+            car_id = first_car + i
+            fuel = rng.choice(FUELS)
+            locs = rng.sample(LOCATIONS, rng.randint(1, 4))
+            cars.append((car_id, rng.choice(models), rng.choice(types), float(rng.randint(60, 600)),
+                         f'Synthetic car {car_id}', 4, rng.randint(1, 6), rng.choice([2, 4, 5, 7]),
+                         rng.choice(COLOURS), 'KLIA', 'KLIA', ', '.join(locs), rng.randint(0, 1), fuel))
+            locations.extend((car_id, loc, loc.upper()) for loc in locs)
+            if fuel == 'Petrol':
+                petrol.append((car_id, 95, 50))
+            elif fuel == 'Diesel':
+                diesel.append((car_id, 'Euro 5', 60))
+            else:
+                electric.append((car_id, 400, 150))
+        conn.executemany("""
+            INSERT INTO Car (car_id, model_id, carType_id, rate, description, door, suitcase, seat, colour,
+                             pickup_location, dropoff_location, available_locations, allows_different_dropoff, fuel_type)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, cars)
+        conn.executemany('INSERT INTO Car_Location (car_id, location_name, location_key) VALUES (?, ?, ?)', locations)
+        conn.executemany('INSERT INTO Petrol (car_id, octane_rating, fuel_tank_capacity) VALUES (?, ?, ?)', petrol)
+        conn.executemany('INSERT INTO Diesel (car_id, diesel_emission, fuel_tank_capacity) VALUES (?, ?, ?)', diesel)
+        conn.executemany('INSERT INTO Electric (car_id, battery_range, charging_rate_kw) VALUES (?, ?, ?)', electric)
+
+        conn.executemany("""
+            INSERT INTO Customer (cust_id, cust_fname, cust_lname, cust_age, cust_email, cust_phone, cust_username, cust_password)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(first_cust + i, 'Bench', f'Customer{i}', 30, f'bench{i}@example.com', None, f'bench{i}', 'bench')
+              for i in range(scale)])
+
+        # One booking per car, so generated bookings never overlap
+        bookings, payments = [], []
+        for i in range(scale):
+            car_id = first_car + i
+            pickup = EPOCH + timedelta(days=rng.randint(0, 3))
+            dropoff = pickup + timedelta(days=rng.randint(0, 3))
+            cust_id = first_cust + rng.randrange(scale)
+            price = 100.0 * ((dropoff - pickup).days + 1)
+            bookings.append((cust_id, rng.choice(staff_ids), car_id, pickup, dropoff, 'KLIA', 'KLIA', price))
+        conn.executemany("""
+            INSERT INTO Booking (cust_id, staff_id, car_id, pickup_date, dropoff_date, pickup_location, dropoff_location, price)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, bookings)
+        for booking_id, price in conn.execute('SELECT booking_id, price FROM Booking'):
+            if rng.random() < 0.6:
+                payments.append((booking_id, price, EPOCH))
+        conn.executemany('INSERT INTO Payment (booking_id, amount, payment_date) VALUES (?, ?, ?)', payments)
+        conn.commit()
+        return {'first_car': first_car, 'first_cust': first_cust, 'staff_id': staff_ids[0]}
+    finally:
+        conn.close()
+
+
+def pending_bookings(cust_id, count):
+    """Create unpaid bookings for the payment benchmark"""
+    conn = Database.backend().connect()
+    try:
+        staff_id = conn.execute('SELECT MIN(staff_id) FROM Staff').fetchone()[0]
+        start = EPOCH + timedelta(days=3650)
+        rows = [(cust_id, staff_id, 1, start + timedelta(days=2 * i), start + timedelta(days=2 * i), 'KLIA', 'KLIA', 100.0)
+                for i in range(count)]
+        conn.executemany("""
+            INSERT INTO Booking (cust_id, staff_id, car_id, pickup_date, dropoff_date, pickup_location, dropoff_location, price)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        conn.commit()
+        return [row[0] for row in conn.execute(
+            'SELECT booking_id FROM Booking WHERE cust_id = ? AND car_id = 1 AND pickup_date >= ?', (cust_id, start))]
+    finally:
+        conn.close()
+
+
+# ==================== SCENARIOS ====================
+
+def build_scenarios(scale, ids):
+    """Map route name -> (session, request factory)"""
+    first_car, first_cust = ids['first_car'], ids['first_cust']
+    customer = {'user_id': first_cust, 'user_type': 'customer'}
+    staff = {'user_id': ids['staff_id'], 'user_type': 'staff'}
+    booking_dates = itertools.count()
+    booking_lock = threading.Lock()
+
+    def next_booking(rng):
+        with booking_lock:
+            n = next(booking_dates)
+        pickup = EPOCH + timedelta(days=5000 + n)
+        return {'car_id': first_car + rng.randrange(scale), 'pickup_date': pickup.strftime('%Y-%m-%d'),
+                'dropoff_date': (pickup + timedelta(days=rng.randint(0, 3))).strftime('%Y-%m-%d'),
+                'pickup_location': 'KLIA', 'dropoff_location': 'KLIA'}
+
+    def cars_query(rng):
+        params = rng.choice([
+            'limit=6',
+            'limit=24',
+            f'location={rng.choice(LOCATIONS)}&limit=24',
+            f'fuel_type={rng.choice(FUELS)}&seats=5&limit=24',
+            'min_price=100&max_price=300&limit=24&include_total=1',
+            'pickup_date=2024-01-02&dropoff_date=2024-01-05&limit=24',
+        ])
+        return ('GET', f'/api/cars?{params}', None)
+
+    return {
+        'cars': (None, cars_query),
+        'cars_full': (None, lambda rng: ('GET', '/api/cars', None)),
+        'car': (None, lambda rng: ('GET', f'/api/car/{first_car + rng.randrange(scale)}', None)),
+        'filters': (None, lambda rng: ('GET', '/api/filters', None)),
+        'my_bookings_customer': (customer, lambda rng: ('GET', '/api/my-bookings', None)),
+        'my_bookings_staff': (staff, lambda rng: ('GET', '/api/my-bookings', None)),
+        'bookings': (customer, lambda rng: ('POST', '/api/bookings', next_booking(rng))),
+        'payment': (customer, None),
+    }
+
+
+def run_route(session, factory, requests, concurrency, seed):
+    """Fire `requests` requests from `concurrency` threads; return latency stats"""
+    latencies, statuses, queries = [], [], []
+    lock = threading.Lock()
+    per_thread = [requests // concurrency + (1 if i < requests % concurrency else 0) for i in range(concurrency)]
+
+    def worker(index, count):
+        rng = random.Random(seed + index)
+        client = app.test_client()
+        if session:
+            with client.session_transaction() as sess:
+                sess.update(session)
+        local = []
+        for _ in range(count):
+            method, url, body = factory(rng)
+            _counter.count = 0
+            start = time.perf_counter()
+            response = client.open(url, method=method, json=body)
+            elapsed = time.perf_counter() - start
+            local.append((elapsed, response.status_code, _counter.count))
+        with lock:
+            for elapsed, status, count in local:
+                latencies.append(elapsed)
+                statuses.append(status)
+                queries.append(count)
+
+    threads = [threading.Thread(target=worker, args=(i, n)) for i, n in enumerate(per_thread) if n]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+
+    def pct(p):
+        return round(latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000, 3)
+
+    return {
+        'requests': len(latencies),
+        'errors': sum(1 for status in statuses if status >= 500),
+        'status_counts': {str(code): statuses.count(code) for code in sorted(set(statuses))},
+        'rps': round(len(latencies) / wall, 1) if wall else None,
+        'p50_ms': pct(50),
+        'p95_ms': pct(95),
+        'p99_ms': pct(99),
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3),
+        'queries_per_request': round(sum(queries) / len(queries), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Carola API on a synthetic fleet')
+    parser.add_argument('--scale', type=int, default=1000, help='cars, customers and bookings to generate (e.g. 1000, 10000, 100000)')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=200, help='requests per route')
+    parser.add_argument('--routes', default='', help='comma-separated subset of routes to run')
+    parser.add_argument('--output', help='write the JSON report to this file')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with app.app_context():
+        Database.get_connection()  # create and seed the schema
+    ids = generate(args.scale, args.seed)
+    setup_seconds = time.perf_counter() - started
+
+    scenarios = build_scenarios(args.scale, ids)
+    selected = [r for r in args.routes.split(',') if r] or list(scenarios)
+
+    results = {}
+    for name in selected:
+        session, factory = scenarios[name]
+        if name == 'payment':
+            booking_ids = iter(pending_bookings(ids['first_cust'], args.requests))
+            id_lock = threading.Lock()
+
+            def factory(rng, booking_ids=booking_ids, id_lock=id_lock):
+                with id_lock:
+                    return ('POST', '/api/payment', {'booking_id': next(booking_ids)})
+        results[name] = run_route(session, factory, args.requests, args.concurrency, args.seed)
+
+    report = {
+        'scale': args.scale,
+        'concurrency': args.concurrency,
+        'requests_per_route': args.requests,
+        'backend': 'sqlite',
+        'setup_seconds': round(setup_seconds, 2),
+        'routes': results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    print(text)
+
+    Database.close_connection()
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(_db_file.name + suffix):
+            os.remove(_db_file.name + suffix)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""JSON serialization benchmark for large API payloads.
+
+Builds a list of booking rows shaped like the staff view of /api/my-bookings
+(with Oracle-style Decimal and datetime values) and times response
+serialization with Flask's default provider, the FastJSONProvider stdlib
+fallback and FastJSONProvider on orjson (when installed). Also reports the
+gzip size and cost for the same payload.
+
+    python bench/json_bench.py --rows 10000 --repeat 20
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+import json_provider  # noqa: E402
+from config import JSON_GZIP_LEVEL  # noqa: E402
+
+
+def build_rows(count, seed):
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    rows = []
+    for i in range(count):
+        pickup = start + timedelta(days=rng.randint(0, 700))
+        rate = Decimal(rng.choice([120, 150, 180, 250, 400])) + Decimal('0.00')
+        days = rng.randint(1, 7)
+        rows.append({
+            'BOOKING_ID': i + 1,
+            'PICKUP_DATE': pickup,
+            'DROPOFF_DATE': pickup + timedelta(days=days),
+            'PICKUP_LOCATION': 'Kuala Lumpur',
+            'DROPOFF_LOCATION': rng.choice(['Kuala Lumpur', 'Penang', 'Johor Bahru']),
+            'PRICE': rate * days,
+            'CAR_ID': rng.randint(1, 500),
+            'MODEL_NAME': rng.choice(['Camry', 'Civic', 'Model 3', 'X70', 'Myvi']),
+            'BRAND_NAME': rng.choice(['Toyota', 'Honda', 'Tesla', 'Proton', 'Perodua']),
+            'COLOUR': rng.choice(['White', 'Black', 'Silver']),
+            'RATE': rate,
+            'CUSTOMER_NAME': f'Customer {rng.randint(1, 5000)}',
+            'CUST_EMAIL': f'customer{i}@example.com',
+            'CUST_PHONE': '012-3456789',
+            'PAYMENT_STATUS': rng.choice(['Paid', 'Pending'])
+        })
+    return rows
+
+
+def time_response(app, payload, repeat):
+    """Median/min milliseconds for app.json.response(payload), plus the body"""
+    samples = []
+    with app.app_context():
+        for _ in range(repeat):
+            started = time.perf_counter()
+            body = app.json.response(payload).get_data()
+            samples.append((time.perf_counter() - started) * 1000)
+    return {'median_ms': round(statistics.median(samples), 2), 'min_ms': round(min(samples), 2)}, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rows = build_rows(args.rows, args.seed)
+    payload = {'success': True, 'bookings': rows}
+
+    # Flask's default provider writes Decimal as a string and dates in HTTP
+    # format; give it the same hook so all encoders produce the same values
+    default_app = Flask('default')
+    default_app.json = DefaultJSONProvider(default_app)
+    default_app.json.default = json_provider._default
+
+    stdlib_app = Flask('stdlib')
+    stdlib_app.json = json_provider.FastJSONProvider(stdlib_app)
+
+    results = {}
+    results['flask_default'], body = time_response(default_app, payload, args.repeat)
+
+    orjson = json_provider.orjson
+    json_provider.orjson = None
+    try:
+        results['fast_provider_stdlib'], _ = time_response(stdlib_app, payload, args.repeat)
+    finally:
+        json_provider.orjson = orjson
+
+    if orjson is not None:
+        fast_app = Flask('orjson')
+        fast_app.json = json_provider.FastJSONProvider(fast_app)
+        results['fast_provider_orjson'], body = time_response(fast_app, payload, args.repeat)
+
+    started = time.perf_counter()
+    compressed = gzip.compress(body, compresslevel=JSON_GZIP_LEVEL, mtime=0)
+    gzip_ms = (time.perf_counter() - started) * 1000
+
+    baseline = results['flask_default']['median_ms']
+    for result in results.values():
+        result['speedup'] = round(baseline / result['median_ms'], 2) if result['median_ms'] else None
+
+    report = {
+        'rows': args.rows,
+        'repeat': args.repeat,
+        'encoders': results,
+        'body_bytes': len(body),
+        'gzip_bytes': len(compressed),
+        'gzip_level': JSON_GZIP_LEVEL,
+        'gzip_ms': round(gzip_ms, 2),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+from json_provider import dumps_bytes
+from collections import OrderedDict
+import json
+import logging
+import threading
+import time
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+class TTLCache:
+    """Thread-safe in-process cache whose entries expire after a fixed TTL"""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._data = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        """Store value under key for the cache's TTL"""
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+
+    def invalidate(self, key=None):
+        """Drop one key, or everything when key is None"""
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def stats(self):
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._data), 'ttl': self.ttl}
+
+class LRUCache(TTLCache):
+    """TTLCache holding at most maxsize entries, evicting the least recently used"""
+    shared = False
+
+    def __init__(self, maxsize, ttl):
+        super().__init__(ttl)
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self.evictions = 0
+
+    def get(self, key):
+        value = super().get(key)
+        if value is not None:
+            with self._lock:
+                if key in self._data:
+                    self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        stats = super().stats()
+        stats.update(maxsize=self.maxsize, evictions=self.evictions, backend='memory')
+        return stats
+
+class RedisCache:
+    """TTL cache in a Redis server, shared by every worker process
+
+    Values are stored as JSON. When the server cannot be reached, reads miss
+    and writes are skipped, so callers fall back to the database. Needs the
+    optional redis package (requirements-optional.txt) and a running server.
+    """
+    shared = True
+
+    def __init__(self, url, ttl, prefix):
+        if redis is None:
+            raise RuntimeError('The redis package is required for a shared cache URL')
+        self.ttl = ttl
+        self._prefix = prefix
+        self._client = redis.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.2)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing, expired or unreachable"""
+        try:
+            raw = self._client.get(f'{self._prefix}{key}')
+        except redis.RedisError as e:
+            logger.warning(f"Shared cache read failed: {e}")
+            self._count('errors')
+            raw = None
+        self._count('hits' if raw is not None else 'misses')
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value):
+        """Store value under key for the cache's TTL"""
+        try:
+            self._client.set(f'{self._prefix}{key}', dumps_bytes(value), ex=self.ttl)
+        except redis.RedisError as e:
+            logger.warning(f"Shared cache write failed: {e}")
+            self._count('errors')
+
+    def invalidate(self, key=None):
+        """Drop one key, or every key under this cache's prefix when key is None"""
+        try:
+            if key is None:
+                keys = list(self._client.scan_iter(match=f'{self._prefix}*'))
+                if keys:
+                    self._client.delete(*keys)
+            else:
+                self._client.delete(f'{self._prefix}{key}')
+        except redis.RedisError as e:
+            logger.warning(f"Shared cache invalidation failed: {e}")
+            self._count('errors')
+
+    def stats(self):
+        """Return this worker's hit/miss/error counters"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'errors': self.errors, 'ttl': self.ttl, 'backend': 'redis'}
+
+def make_cache(url, maxsize, ttl, prefix):
+    """Shared Redis cache when url is set (redis://host:port/db), otherwise an in-process LRU"""
+    if url:
+        return RedisCache(url, ttl, prefix)
+    return LRUCache(maxsize, ttl)
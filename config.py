@@ -3,15 +3,80 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-# Oracle Database Configuration
+# Database Configuration
+# DB_BACKEND=sqlite runs against a local SQLite file seeded from the SQL scripts
+# (for benchmarks and tests without an Oracle instance)
 DB_CONFIG = {
+    'backend': os.environ.get('DB_BACKEND', 'oracle'),
+    'sqlite_path': os.environ.get('DB_SQLITE_PATH', 'carola.sqlite3'),
     'user': 'carola',
     'password': 'carola',
-    'dsn': 'localhost:1521/FREEPDB1'
+    'dsn': 'localhost:1521/FREEPDB1',
+    # Session pool settings (set DB_POOL_ENABLED=0 to fall back to a single shared connection)
+    'pool_enabled': os.environ.get('DB_POOL_ENABLED', '1') == '1',
+    'pool_min': int(os.environ.get('DB_POOL_MIN', 2)),
+    'pool_max': int(os.environ.get('DB_POOL_MAX', 10)),
+    'pool_increment': int(os.environ.get('DB_POOL_INCREMENT', 1)),
+    'pool_wait_timeout': int(os.environ.get('DB_POOL_WAIT_TIMEOUT', 5000)),  # ms to wait for a free session
+    'pool_ping_interval': int(os.environ.get('DB_POOL_PING_INTERVAL', 60)),  # seconds idle before a session is pinged
+    'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 300)),  # seconds before idle sessions above min are closed
+    'stmt_cache_size': int(os.environ.get('DB_STMT_CACHE_SIZE', 100))  # parsed statements kept per connection (0 disables)
 }
 
 # Flask Configuration
 SECRET_KEY = os.environ.get('SECRET_KEY', 'your-secret-key-change-in-production')
 UPLOAD_FOLDER = 'static/uploads'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+FUEL_TYPES = ('Petrol', 'Diesel', 'Electric')
 
+# Resized copies written for every car image upload (name -> max width in px)
+IMAGE_VARIANTS = {'thumb': 160, 'card': 400, 'detail': 1200}
+IMAGE_QUALITY = 80
+
+# API Configuration
+CARS_PAGE_MAX = int(os.environ.get('CARS_PAGE_MAX', 100))  # largest page /api/cars will return
+BOOKINGS_PAGE_MAX = int(os.environ.get('BOOKINGS_PAGE_MAX', 200))  # largest page of the staff bookings view
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 500))  # rows fetched per round trip by streaming exports
+IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', 500))  # cars inserted per executemany by the fleet import
+IMPORT_MAX_ROWS = int(os.environ.get('IMPORT_MAX_ROWS', 5000))  # largest fleet import accepted in one request
+QUOTE_MAX_CARS = int(os.environ.get('QUOTE_MAX_CARS', 100))  # most cars priced by one /api/quote call
+STATS_TOP_MAX = int(os.environ.get('STATS_TOP_MAX', 25))  # longest top-cars and upcoming-pickups lists on the admin dashboard
+STATS_PAGE_MAX = int(os.environ.get('STATS_PAGE_MAX', 100))  # largest page of per-car utilization
+
+# Cache Configuration
+FILTERS_CACHE_TTL = int(os.environ.get('FILTERS_CACHE_TTL', 300))  # seconds
+STATIC_MAX_AGE = int(os.environ.get('STATIC_MAX_AGE', 31536000))  # content-hashed assets and uploads never change
+UPLOAD_MAX_AGE = int(os.environ.get('UPLOAD_MAX_AGE', 3600))  # older uploads without a hash in the name
+CAR_CACHE_SIZE = int(os.environ.get('CAR_CACHE_SIZE', 1000))  # car detail records kept per worker
+CAR_CACHE_TTL = int(os.environ.get('CAR_CACHE_TTL', 300))  # seconds
+CAR_CACHE_URL = os.environ.get('CAR_CACHE_URL', '')  # e.g. redis://localhost:6379/0 to share car records across workers
+RATE_CACHE_TTL = int(os.environ.get('RATE_CACHE_TTL', 300))  # seconds a car's daily rate is reused for quotes
+STATS_CACHE_TTL = int(os.environ.get('STATS_CACHE_TTL', 60))  # seconds the admin dashboard statistics are reused
+STATS_CACHE_SIZE = int(os.environ.get('STATS_CACHE_SIZE', 16))  # (days, months, top) combinations kept per worker
+STAFF_LOAD_TTL = int(os.environ.get('STAFF_LOAD_TTL', 60))  # seconds before the staff workload table is reloaded from Booking
+ASSET_PRECOMPRESS = os.environ.get('ASSET_PRECOMPRESS', '1') == '1'  # keep gzip/brotli copies of CSS and JS
+
+# Authentication
+PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')  # werkzeug method for new password hashes
+AUTH_HASH_WORKERS = int(os.environ.get('AUTH_HASH_WORKERS', os.cpu_count() or 2))  # threads hashing passwords at once
+AUTH_HASH_QUEUE = int(os.environ.get('AUTH_HASH_QUEUE', 32))  # hashes allowed to wait for a worker before logins get a 503
+AUTH_CACHE_TTL = int(os.environ.get('AUTH_CACHE_TTL', 300))  # seconds a verified password skips the hash check
+AUTH_CACHE_SIZE = int(os.environ.get('AUTH_CACHE_SIZE', 10000))  # verified passwords remembered per worker
+
+# Response Compression
+JSON_GZIP_MIN_BYTES = int(os.environ.get('JSON_GZIP_MIN_BYTES', 1024))  # smaller JSON bodies are sent as-is
+JSON_GZIP_LEVEL = int(os.environ.get('JSON_GZIP_LEVEL', 6))
+
+# Production Server (gunicorn.conf.py)
+SERVER_BIND = os.environ.get('SERVER_BIND', '0.0.0.0:5000')
+SERVER_WORKERS = int(os.environ.get('SERVER_WORKERS', (os.cpu_count() or 1) * 2 + 1))  # processes, each with its own session pool
+SERVER_THREADS = int(os.environ.get('SERVER_THREADS', 4))  # request threads per worker; keep at or below DB_POOL_MAX
+SERVER_TIMEOUT = int(os.environ.get('SERVER_TIMEOUT', 60))  # seconds a busy worker may go silent before it is killed
+SERVER_GRACEFUL_TIMEOUT = int(os.environ.get('SERVER_GRACEFUL_TIMEOUT', 30))  # seconds a stopping worker gets to finish requests
+SERVER_MAX_REQUESTS = int(os.environ.get('SERVER_MAX_REQUESTS', 5000))  # requests before a worker is replaced (0 disables)
+SERVER_MAX_REQUESTS_JITTER = int(os.environ.get('SERVER_MAX_REQUESTS_JITTER', 500))  # so workers are not all replaced at once
+SERVER_KEEPALIVE = int(os.environ.get('SERVER_KEEPALIVE', 5))  # seconds
+
+# Instrumentation
+SQL_METRICS_ENABLED = os.environ.get('SQL_METRICS_ENABLED', '1') == '1'
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 200))  # statements slower than this go to the slow-query log
@@ -13,6 +13,8 @@ DELETE FROM Booking;
 DELETE FROM Electric;
 DELETE FROM Diesel;
 DELETE FROM Petrol;
+DELETE FROM Car_Location;
+DELETE FROM Car_Image;
 DELETE FROM Car;
 DELETE FROM Model;
 DELETE FROM CarType;
@@ -637,5 +639,30 @@ JOIN CarType ct ON c.carType_id = ct.carType_id
 WHERE m.model_name = 'Model 3' AND m.brand_id = (SELECT brand_id FROM Brand WHERE brand_name = 'Tesla')
   AND ct.carType_name = 'Luxury' AND c.rate = 380.00;
 
+-- ============================================================================
+-- INSERT CAR LOCATIONS (split from Car.available_locations)
+-- ============================================================================
+INSERT INTO Car_Location (car_id, location_name, location_key)
+SELECT car_id, MIN(location_name), UPPER(location_name)
+FROM (
+    SELECT c.car_id, TRIM(REGEXP_SUBSTR(c.available_locations, '[^,]+', 1, n.idx)) AS location_name
+    FROM Car c
+    JOIN (SELECT LEVEL AS idx FROM dual CONNECT BY LEVEL <= 250) n
+      ON n.idx <= REGEXP_COUNT(c.available_locations, '[^,]+')
+    WHERE c.available_locations IS NOT NULL
+)
+WHERE location_name IS NOT NULL
+GROUP BY car_id, UPPER(location_name);
+
+-- ============================================================================
+-- SET CAR FUEL TYPE (denormalized from the subtables above)
+-- ============================================================================
+UPDATE Car c SET fuel_type = CASE
+    WHEN EXISTS (SELECT 1 FROM Petrol WHERE car_id = c.car_id) THEN 'Petrol'
+    WHEN EXISTS (SELECT 1 FROM Diesel WHERE car_id = c.car_id) THEN 'Diesel'
+    WHEN EXISTS (SELECT 1 FROM Electric WHERE car_id = c.car_id) THEN 'Electric'
+    ELSE 'N/A'
+END;
+
 -- Commit all changes
 COMMIT;
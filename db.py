@@ -1,55 +1,665 @@
 import oracledb
-from config import DB_CONFIG
+from config import DB_CONFIG, SQL_METRICS_ENABLED
+from flask import g, has_app_context
+from metrics import record_statement, statement_cache
+from contextlib import contextmanager
+from datetime import date, datetime
+from functools import lru_cache
 import logging
+import os
+import itertools
+import re
+import sqlite3
+import threading
+import time
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# ==================== ROW CONVERSION ====================
+
+_TEMPORAL_TYPES = (oracledb.DB_TYPE_DATE, oracledb.DB_TYPE_TIMESTAMP,
+                   oracledb.DB_TYPE_TIMESTAMP_TZ, oracledb.DB_TYPE_TIMESTAMP_LTZ)
+
+def _isoformat(value):
+    return value.isoformat()
+
+def _json_value(value):
+    """Fallback for columns whose type the driver does not report"""
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+@lru_cache(maxsize=512)
+def row_plan(columns, json_ready):
+    """Build a rowfactory for a result shape: ((name, type_code), ...) -> dict rows
+
+    Plans are cached per column layout, so each distinct statement pays for
+    this once. With json_ready, columns the driver cannot type (SQLite) get
+    a converter; typed Oracle columns are already converted by
+    OracleBackend.output_type_handler while fetching.
+    """
+    names = tuple(name.upper() for name, _ in columns)
+    converters = tuple(
+        (index, names[index], _json_value)
+        for index, (_, type_code) in enumerate(columns)
+        if json_ready and type_code is None
+    )
+    if not converters:
+        return lambda *row: dict(zip(names, row))
+
+    def rowfactory(*row):
+        record = dict(zip(names, row))
+        for index, name, convert in converters:
+            value = row[index]
+            if value is not None:
+                record[name] = convert(value)
+        return record
+    return rowfactory
+
+# ==================== ORACLE BACKEND ====================
+
+class OracleBackend:
+    """Oracle Database through python-oracledb"""
+    name = 'oracle'
+
+    def session_key(self, conn):
+        """Stable key for the session behind a connection
+
+        pool.acquire() wraps the pooled session in a new Connection object each
+        time, so the key is the identity of the driver's session object, which
+        the pool hands back on every acquire of that session. Reading it has no
+        effect on the session, unlike pool tags.
+        """
+        return id(getattr(conn, '_impl', conn))
+
+    def connect(self):
+        """Open a standalone connection"""
+        return oracledb.connect(
+            user=DB_CONFIG['user'],
+            password=DB_CONFIG['password'],
+            dsn=DB_CONFIG['dsn'],
+            stmtcachesize=DB_CONFIG['stmt_cache_size']
+        )
+
+    def pool_params(self):
+        """Session pool settings, shared by the sync pool and the asyncio pool in db_async"""
+        return dict(
+            user=DB_CONFIG['user'],
+            password=DB_CONFIG['password'],
+            dsn=DB_CONFIG['dsn'],
+            min=DB_CONFIG['pool_min'],
+            max=DB_CONFIG['pool_max'],
+            increment=DB_CONFIG['pool_increment'],
+            getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+            wait_timeout=DB_CONFIG['pool_wait_timeout'],
+            ping_interval=DB_CONFIG['pool_ping_interval'],
+            timeout=DB_CONFIG['pool_timeout'],
+            stmtcachesize=DB_CONFIG['stmt_cache_size']
+        )
+
+    def create_pool(self):
+        """Create an oracledb session pool"""
+        return oracledb.create_pool(**self.pool_params())
+
+    def begin(self, conn):
+        """Oracle opens transactions implicitly"""
+        pass
+
+    def parse_stats(self, conn):
+        """Session parse and cursor cache counters, or None without access to v$mystat"""
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT n.name, s.value FROM v$mystat s
+                JOIN v$statname n ON s.statistic# = n.statistic#
+                WHERE n.name IN ('parse count (total)', 'parse count (hard)',
+                                 'session cursor cache hits', 'execute count')
+            """)
+            return {name: int(value) for name, value in cursor.fetchall()}
+        except oracledb.DatabaseError as e:
+            logger.info(f"Parse statistics unavailable: {e}")
+            return None
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def output_type_handler(cursor, metadata):
+        """Fetch NUMBER as int/float (never Decimal) and dates as ISO strings"""
+        if metadata.type_code is oracledb.DB_TYPE_NUMBER:
+            if metadata.scale and metadata.scale > 0:
+                return cursor.var(float, arraysize=cursor.arraysize)
+            if metadata.precision and metadata.scale == 0:
+                return cursor.var(int, arraysize=cursor.arraysize)
+        elif metadata.type_code in _TEMPORAL_TYPES:
+            return cursor.var(metadata.type_code, arraysize=cursor.arraysize, outconverter=_isoformat)
+
+# ==================== SQLITE BACKEND ====================
+
+# Oracle dialect -> SQLite rewrites applied to every statement the app runs
+_SQL_REWRITES = [
+    # MERGE ... USING (SELECT :key FROM dual) upserts -> INSERT ... ON CONFLICT DO UPDATE
+    (re.compile(r'^\s*MERGE\s+INTO\s+(\w+)\s+\w+\s+USING\s+\(SELECT\s.*?\sFROM\s+dual\)\s+\w+\s+'
+                r'ON\s+\(\w+\.(\w+)\s*=\s*\w+\.\w+\)\s+WHEN\s+MATCHED\s+THEN\s+UPDATE\s+SET\s+(.*?)\s+'
+                r'WHEN\s+NOT\s+MATCHED\s+THEN\s+INSERT\s+(\([^)]*\))\s+VALUES\s+(\(.*\))\s*$', re.I | re.S),
+     r'INSERT INTO \1 \4 VALUES \5 ON CONFLICT (\2) DO UPDATE SET \3'),
+    (re.compile(r'\s+FOR\s+UPDATE\b(\s+OF\s+[\w.,\s]+)?', re.I), ''),
+    (re.compile(r'OFFSET\s+(:\w+|\d+)\s+ROWS\s+FETCH\s+(?:NEXT|FIRST)\s+(:\w+|\d+)\s+ROWS\s+ONLY', re.I), r'LIMIT \2 OFFSET \1'),
+    (re.compile(r'FETCH\s+(?:NEXT|FIRST)\s+(:\w+|\d+)\s+ROWS\s+ONLY', re.I), r'LIMIT \1'),
+    (re.compile(r'OFFSET\s+(:\w+|\d+)\s+ROWS\b', re.I), r'LIMIT -1 OFFSET \1'),
+    (re.compile(r'\s+WHERE\s+ROWNUM\s*=\s*1\s*$', re.I), ' LIMIT 1'),
+    (re.compile(r'\s+FROM\s+dual\s*$', re.I), ''),
+    (re.compile(r"TO_DATE\(\s*([^,()]+?)\s*,\s*'YYYY-MM-DD'\s*\)", re.I), r'datetime(\1)'),
+    (re.compile(r"TO_CHAR\(\s*([^,()]+?)\s*,\s*'YYYY-MM'\s*\)", re.I), r"strftime('%Y-%m', \1)"),
+    # Days between clamped dates: LEAST(end, :to) - GREATEST(start, :from)
+    (re.compile(r'LEAST\(([^()]+)\)\s*-\s*GREATEST\(([^()]+)\)', re.I), r'(julianday(MIN(\1)) - julianday(MAX(\2)))'),
+    (re.compile(r'\bDEFAULT\s+SYSDATE\b', re.I), "DEFAULT (datetime('now', 'localtime'))"),
+    (re.compile(r'\bSYSDATE\b', re.I), "datetime('now', 'localtime')"),
+    (re.compile(r'^(\s*UPDATE\s+\w+)\s+(?!SET\b)(\w+)\s+SET\b', re.I), r'\1 AS \2 SET'),
+]
+
+# Extra rewrites for the DDL in tablebaru.sql
+_DDL_REWRITES = [
+    (re.compile(r'NUMBER\s+GENERATED\s+BY\s+DEFAULT\s+AS\s+IDENTITY\s+PRIMARY\s+KEY', re.I), 'INTEGER PRIMARY KEY AUTOINCREMENT'),
+    (re.compile(r'VARCHAR2\(\d+\)', re.I), 'TEXT'),
+    (re.compile(r'NUMBER\(\d+\s*,\s*\d+\)', re.I), 'REAL'),
+    (re.compile(r'\bNUMBER(\(\d+\))?', re.I), 'INTEGER'),
+]
+
+_RETURNING_INTO = re.compile(r'\bRETURNING\s+(\w+)\s+INTO\s+:(\w+)', re.I)
+
+@lru_cache(maxsize=512)
+def translate_sql(query):
+    """Rewrite an Oracle-dialect statement for SQLite"""
+    for pattern, replacement in _SQL_REWRITES:
+        query = pattern.sub(replacement, query)
+    return query
+
+def translate_ddl(statement):
+    """Rewrite an Oracle DDL/seed statement for SQLite, or None to skip it"""
+    body = re.sub(r'--[^\n]*', '', statement).strip().rstrip(';').strip()
+    upper = body.upper()
+    if not body or upper == 'COMMIT':
+        return None
+    # SQLite cannot add constraints after the fact, and the location backfill
+    # relies on CONNECT BY; both are handled by SQLiteBackend instead
+    if upper.startswith('ALTER TABLE') or 'CONNECT BY' in upper:
+        return None
+    for pattern, replacement in _DDL_REWRITES:
+        body = pattern.sub(replacement, body)
+    return translate_sql(body)
+
+def _iter_statements(text):
+    """Split a SQL script into complete statements"""
+    buf = []
+    for line in text.splitlines():
+        buf.append(line)
+        statement = '\n'.join(buf)
+        if sqlite3.complete_statement(statement):
+            yield statement
+            buf = []
+
+def _convert_date(value):
+    return datetime.fromisoformat(value.decode())
+
+class BindVar:
+    """Stand-in for an oracledb output variable used with RETURNING ... INTO"""
+
+    def __init__(self, typ, arraysize=1):
+        self.type = typ
+        self._values = {}
+
+    def setvalue(self, pos, value):
+        self._values[pos] = [value]
+
+    def getvalue(self, pos=0):
+        """Values returned by the pos-th execution (one per row, like oracledb)"""
+        return self._values.get(pos, [])
+
+class SQLiteCursor(sqlite3.Cursor):
+    """Cursor that accepts the app's Oracle-dialect SQL"""
+
+    _input_vars = None
+
+    def execute(self, sql, params=()):
+        sql = translate_sql(sql)
+        returning = _RETURNING_INTO.search(sql)
+        if returning and isinstance(params, dict):
+            params = dict(params)
+            out_var = params.pop(returning.group(2))
+            self._execute_returning(_RETURNING_INTO.sub(r'RETURNING \1', sql), params, out_var, 0)
+            return self
+        return super().execute(sql, params or ())
+
+    def executemany(self, sql, seq_of_params):
+        sql = translate_sql(sql)
+        returning = _RETURNING_INTO.search(sql)
+        if returning and self._input_vars and returning.group(2) in self._input_vars:
+            # sqlite3 cannot return rows from executemany; run the rows one by one
+            out_var = self._input_vars[returning.group(2)]
+            sql = _RETURNING_INTO.sub(r'RETURNING \1', sql)
+            for pos, params in enumerate(seq_of_params):
+                self._execute_returning(sql, params, out_var, pos)
+            return self
+        return super().executemany(sql, seq_of_params)
+
+    def _execute_returning(self, sql, params, out_var, pos):
+        super().execute(sql, params)
+        rows = self.fetchall()
+        out_var.setvalue(pos, rows[0][0] if rows else None)
+
+    def setinputsizes(self, *args, **kwargs):
+        """Remember output variables bound by name for a following executemany"""
+        self._input_vars = kwargs
+
+    def var(self, typ, arraysize=1):
+        return BindVar(typ, arraysize)
+
+    @property
+    def rowfactory(self):
+        return self._rowfactory if self.row_factory else None
+
+    @rowfactory.setter
+    def rowfactory(self, factory):
+        """oracledb-style rowfactory(*values) on top of sqlite3's row_factory(cursor, row)"""
+        self._rowfactory = factory
+        self.row_factory = (lambda cursor, row: factory(*row)) if factory else None
+
+_sqlite_session_ids = itertools.count(1)
+
+class SQLiteConnection(sqlite3.Connection):
+    """SQLite connection handing out Oracle-compatible cursors"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.session_key = next(_sqlite_session_ids)
+
+    def cursor(self, factory=SQLiteCursor):
+        return super().cursor(factory)
+
+    def is_healthy(self):
+        try:
+            super().execute('SELECT 1')
+            return True
+        except sqlite3.Error:
+            return False
+
+class SQLitePool:
+    """Minimal stand-in for an oracledb session pool over SQLite connections"""
+
+    def __init__(self, connect, min, max, increment, wait_timeout):
+        self._connect = connect
+        self.min = min
+        self.max = max
+        self.increment = increment
+        self._wait_timeout = wait_timeout / 1000
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max)
+        self.opened = 0
+        self.busy = 0
+
+    def acquire(self):
+        if not self._slots.acquire(timeout=self._wait_timeout):
+            raise TimeoutError('Timed out waiting for a free SQLite connection')
+        with self._lock:
+            self.busy += 1
+            if self._idle:
+                return self._idle.pop()
+            self.opened += 1
+        return self._connect()
+
+    def release(self, conn):
+        conn.rollback()
+        with self._lock:
+            self.busy -= 1
+            self._idle.append(conn)
+        self._slots.release()
+
+    def drop(self, conn):
+        conn.close()
+        with self._lock:
+            self.busy -= 1
+            self.opened -= 1
+        self._slots.release()
+
+    def close(self, force=False):
+        with self._lock:
+            for conn in self._idle:
+                conn.close()
+            self.opened -= len(self._idle)
+            self._idle = []
+
+class SQLiteBackend:
+    """Local SQLite stand-in for load testing without an Oracle instance"""
+    name = 'sqlite'
+    # Column types are unknown to sqlite3, so row_plan converts values instead
+    output_type_handler = None
+
+    # Schema and seed data, loaded into a new database file in this order
+    SCRIPTS = ('tablebaru.sql', 'databaru.sql', 'sample_users.sql')
+
+    def __init__(self, path):
+        self.path = path
+        self._ready = False
+        self._lock = threading.Lock()
+        sqlite3.register_adapter(datetime, lambda value: value.isoformat(' ', 'seconds'))
+        sqlite3.register_adapter(date, lambda value: value.isoformat() + ' 00:00:00')
+        sqlite3.register_converter('DATE', _convert_date)
+
+    def _open(self):
+        conn = sqlite3.connect(
+            self.path,
+            timeout=30,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,
+            factory=SQLiteConnection,
+            cached_statements=DB_CONFIG['stmt_cache_size']
+        )
+        conn.execute('PRAGMA foreign_keys = ON')
+        return conn
+
+    def parse_stats(self, conn):
+        """sqlite3 does not expose its statement cache counters"""
+        return None
+
+    def session_key(self, conn):
+        """SQLitePool hands out the same connection object, which carries its own key"""
+        return conn.session_key
+
+    def connect(self):
+        """Open a connection, creating and seeding the database on first use"""
+        if not self._ready:
+            with self._lock:
+                if not self._ready:
+                    self.ensure_schema()
+                    self._ready = True
+        return self._open()
+
+    def create_pool(self):
+        """Create a pool of SQLite connections"""
+        return SQLitePool(
+            self.connect,
+            min=DB_CONFIG['pool_min'],
+            max=DB_CONFIG['pool_max'],
+            increment=DB_CONFIG['pool_increment'],
+            wait_timeout=DB_CONFIG['pool_wait_timeout']
+        )
+
+    def begin(self, conn):
+        """Take the write lock up front; SQLite's stand-in for SELECT ... FOR UPDATE"""
+        if not conn.in_transaction:
+            conn.execute('BEGIN IMMEDIATE')
+
+    def ensure_schema(self, scripts=None):
+        """Create tables and load seed data if the database is empty"""
+        conn = self._open()
+        try:
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Car'").fetchone():
+                return
+            conn.execute('PRAGMA journal_mode = WAL')
+            for script in scripts or self.SCRIPTS:
+                self.load_script(conn, os.path.join(BASE_DIR, script))
+            self.backfill_car_locations(conn)
+            conn.commit()
+            logger.info(f"SQLite database initialised at {self.path}")
+        finally:
+            conn.close()
+
+    def load_script(self, conn, path):
+        """Run an Oracle SQL script against SQLite, translating as it goes"""
+        with open(path, encoding='utf-8') as f:
+            text = f.read()
+        for statement in _iter_statements(text):
+            translated = translate_ddl(statement)
+            if translated:
+                conn.execute(translated)
+
+    def backfill_car_locations(self, conn):
+        """Split Car.available_locations into Car_Location rows"""
+        rows = []
+        for car_id, available in conn.execute('SELECT car_id, available_locations FROM Car').fetchall():
+            seen = set()
+            for loc in (available or '').split(','):
+                loc = loc.strip()
+                if loc and loc.upper() not in seen:
+                    seen.add(loc.upper())
+                    rows.append((car_id, loc, loc.upper()))
+        conn.executemany('INSERT INTO Car_Location (car_id, location_name, location_key) VALUES (?, ?, ?)', rows)
+
+def create_backend(name=None):
+    """Build the backend named in DB_CONFIG['backend']"""
+    name = name or DB_CONFIG.get('backend', 'oracle')
+    if name == 'oracle':
+        return OracleBackend()
+    if name == 'sqlite':
+        return SQLiteBackend(DB_CONFIG['sqlite_path'])
+    raise ValueError(f"Unknown database backend: {name}")
+
+def observe_statement(conn, sql):
+    """Feed an execute on conn into the statement cache estimate"""
+    if SQL_METRICS_ENABLED:
+        statement_cache.observe(Database.backend().session_key(conn), sql)
+
+class TimedCursor:
+    """Cursor wrapper that records each execute in the SQL metrics"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, sql, params=None):
+        observe_statement(self._cursor.connection, sql)
+        start = time.perf_counter()
+        try:
+            return self._cursor.execute(sql, params) if params else self._cursor.execute(sql)
+        finally:
+            record_statement(sql, time.perf_counter() - start, max(self._cursor.rowcount or 0, 0))
+
+    def executemany(self, sql, params_list):
+        observe_statement(self._cursor.connection, sql)
+        start = time.perf_counter()
+        try:
+            return self._cursor.executemany(sql, params_list)
+        finally:
+            record_statement(sql, time.perf_counter() - start, max(self._cursor.rowcount or 0, 0))
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+# ==================== DATABASE ====================
+
 class Database:
+    _backend = None
     _connection = None
-    
+    _pool = None
+    _pool_lock = threading.Lock()
+
+    # Acquire statistics for the session pool
+    _stats_lock = threading.Lock()
+    _acquire_count = 0
+    _acquire_wait_total = 0.0
+    _acquire_wait_max = 0.0
+    _stale_dropped = 0
+
+    @staticmethod
+    def init_app(app):
+        """Release the request's pooled connection when the app context ends"""
+        app.teardown_appcontext(Database.release_connection)
+
+    @staticmethod
+    def backend():
+        """Get the configured database backend"""
+        if Database._backend is None:
+            Database._backend = create_backend()
+        return Database._backend
+
+    @staticmethod
+    def get_pool():
+        """Get or create the session pool"""
+        if Database._pool is None:
+            with Database._pool_lock:
+                if Database._pool is None:
+                    try:
+                        Database._pool = Database.backend().create_pool()
+                        logger.info(f"Database pool created (min={DB_CONFIG['pool_min']}, max={DB_CONFIG['pool_max']})")
+                    except Exception as e:
+                        logger.error(f"Error creating database pool: {e}")
+                        raise
+        return Database._pool
+
+    @staticmethod
+    def _acquire():
+        """Acquire a healthy session from the pool, recording wait time"""
+        pool = Database.get_pool()
+        start = time.perf_counter()
+        conn = pool.acquire()
+        if not conn.is_healthy():
+            # Session went stale while idle (network drop, DB restart); replace it
+            statement_cache.forget(Database.backend().session_key(conn))
+            pool.drop(conn)
+            conn = pool.acquire()
+            with Database._stats_lock:
+                Database._stale_dropped += 1
+        waited = time.perf_counter() - start
+        with Database._stats_lock:
+            Database._acquire_count += 1
+            Database._acquire_wait_total += waited
+            Database._acquire_wait_max = max(Database._acquire_wait_max, waited)
+        return conn
+
     @staticmethod
     def get_connection():
-        """Get or create database connection"""
+        """Get the current request's pooled connection, or the shared connection"""
+        if DB_CONFIG.get('pool_enabled') and has_app_context():
+            conn = g.get('_db_connection')
+            if conn is None:
+                conn = Database._acquire()
+                g._db_connection = conn
+            return conn
+
         if Database._connection is None:
             try:
-                Database._connection = oracledb.connect(
-                    user=DB_CONFIG['user'],
-                    password=DB_CONFIG['password'],
-                    dsn=DB_CONFIG['dsn']
-                )
+                Database._connection = Database.backend().connect()
                 logger.info("Database connection established")
             except Exception as e:
                 logger.error(f"Error connecting to database: {e}")
                 raise
         return Database._connection
-    
+
+    @staticmethod
+    def release_connection(exc=None):
+        """Return the current request's connection to the pool"""
+        conn = g.pop('_db_connection', None)
+        if conn is None:
+            return
+        try:
+            Database.get_pool().release(conn)
+        except Exception as e:
+            logger.error(f"Error releasing connection: {e}")
+
+    @staticmethod
+    def pool_stats():
+        """Return session pool statistics"""
+        with Database._stats_lock:
+            acquires = Database._acquire_count
+            wait_total = Database._acquire_wait_total
+            wait_max = Database._acquire_wait_max
+            stale_dropped = Database._stale_dropped
+        stats = {
+            'backend': Database.backend().name,
+            'enabled': bool(DB_CONFIG.get('pool_enabled')),
+            'acquires': acquires,
+            'wait_avg_ms': round(wait_total / acquires * 1000, 3) if acquires else 0.0,
+            'wait_max_ms': round(wait_max * 1000, 3),
+            'stale_dropped': stale_dropped,
+            'stmt_cache_size': DB_CONFIG['stmt_cache_size']
+        }
+        pool = Database._pool
+        if pool is not None:
+            stats.update({
+                'open': pool.opened,
+                'busy': pool.busy,
+                'min': pool.min,
+                'max': pool.max,
+                'increment': pool.increment
+            })
+        return stats
+
+    @staticmethod
+    def parse_stats():
+        """Server-side parse counters for the current session, where the backend reports them"""
+        return Database.backend().parse_stats(Database.get_connection())
+
+    @staticmethod
+    def reset_after_fork():
+        """Forget the pool and connection inherited from the parent process
+
+        Sessions are sockets, so a forked worker must not use (or close) the
+        parent's; it opens its own pool on first use. Called by os.register_at_fork.
+        """
+        Database._pool = None
+        Database._connection = None
+        Database._pool_lock = threading.Lock()
+        Database._stats_lock = threading.Lock()
+        Database._acquire_count = 0
+        Database._acquire_wait_total = 0.0
+        Database._acquire_wait_max = 0.0
+        Database._stale_dropped = 0
+        statement_cache.forget()
+
+    @staticmethod
+    def ping():
+        """Run a trivial statement on a pooled session; raises when the database is unreachable"""
+        Database.execute_query("SELECT 1 as ok FROM dual")
+
     @staticmethod
     def close_connection():
-        """Close database connection"""
+        """Close database connection and session pool"""
         if Database._connection:
             Database._connection.close()
             Database._connection = None
             logger.info("Database connection closed")
-    
+        if Database._pool:
+            Database._pool.close(force=True)
+            Database._pool = None
+            logger.info("Database pool closed")
+        # Their sessions are gone, and with them the driver's statement caches
+        statement_cache.forget()
+
     @staticmethod
-    def execute_query(query, params=None, fetch=True):
-        """Execute a query and return results"""
+    def execute_query(query, params=None, fetch=True, json_ready=False):
+        """Execute a query and return results
+
+        With json_ready=True rows come back ready for jsonify: numbers as
+        int/float and dates as ISO-8601 strings.
+        """
         conn = Database.get_connection()
         cursor = conn.cursor()
+        handler = Database.backend().output_type_handler
+        if json_ready and handler is not None:
+            cursor.outputtypehandler = handler
+        observe_statement(conn, query)
+        start = time.perf_counter()
         try:
             if params:
                 cursor.execute(query, params)
             else:
                 cursor.execute(query)
-            
+
             if fetch:
-                columns = [desc[0].upper() for desc in cursor.description] if cursor.description else []
-                rows = cursor.fetchall()
-                result = [dict(zip(columns, row)) for row in rows] if columns else []
+                result = []
+                if cursor.description:
+                    columns = tuple((desc[0], desc[1]) for desc in cursor.description)
+                    cursor.rowfactory = row_plan(columns, json_ready)
+                    result = cursor.fetchall()
+                record_statement(query, time.perf_counter() - start, len(result))
                 return result
             else:
                 conn.commit()
+                record_statement(query, time.perf_counter() - start, cursor.rowcount)
                 return cursor.rowcount
         except Exception as e:
             conn.rollback()
@@ -57,15 +667,74 @@ class Database:
             raise
         finally:
             cursor.close()
-    
+
+    @staticmethod
+    def stream_query(query, params=None, batch_size=100, json_ready=True):
+        """Yield the results of a query as lists of at most batch_size rows
+
+        Only one batch is held in memory at a time. The statement runs on the
+        first next() call, and the cursor stays open until the generator is
+        exhausted or closed.
+        """
+        conn = Database.get_connection()
+        cursor = conn.cursor()
+        cursor.arraysize = batch_size
+        handler = Database.backend().output_type_handler
+        if json_ready and handler is not None:
+            cursor.outputtypehandler = handler
+        observe_statement(conn, query)
+        start = time.perf_counter()
+        rows = 0
+        try:
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            if not cursor.description:
+                return
+            columns = tuple((desc[0], desc[1]) for desc in cursor.description)
+            cursor.rowfactory = row_plan(columns, json_ready)
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                rows += len(batch)
+                yield batch
+        except Exception as e:
+            logger.error(f"Stream query error: {e}")
+            raise
+        finally:
+            cursor.close()
+            record_statement(query, time.perf_counter() - start, rows)
+
+    @staticmethod
+    @contextmanager
+    def transaction():
+        """Yield a cursor whose statements are committed together, or rolled back on error"""
+        conn = Database.get_connection()
+        Database.backend().begin(conn)
+        cursor = conn.cursor()
+        try:
+            yield TimedCursor(cursor)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Transaction error: {e}")
+            raise
+        finally:
+            cursor.close()
+
     @staticmethod
     def execute_many(query, params_list):
         """Execute a query multiple times with different parameters"""
         conn = Database.get_connection()
         cursor = conn.cursor()
+        observe_statement(conn, query)
+        start = time.perf_counter()
         try:
             cursor.executemany(query, params_list)
             conn.commit()
+            record_statement(query, time.perf_counter() - start, cursor.rowcount)
             return cursor.rowcount
         except Exception as e:
             conn.rollback()
@@ -74,3 +743,5 @@ class Database:
         finally:
             cursor.close()
 
+# Pre-fork servers (gunicorn --preload) copy this module into every worker
+os.register_at_fork(after_in_child=Database.reset_after_fork)
@@ -0,0 +1,144 @@
+import oracledb
+from config import DB_CONFIG
+from db import Database, observe_statement, row_plan
+from metrics import record_statement, statement_cache
+from contextlib import asynccontextmanager
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# ==================== SQLITE ADAPTER ====================
+
+class AsyncSQLiteCursor:
+    """asyncio face of a SQLiteCursor; each call runs in a worker thread"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    async def execute(self, sql, params=None):
+        await asyncio.to_thread(self._cursor.execute, sql, params or ())
+
+    async def fetchall(self):
+        return await asyncio.to_thread(self._cursor.fetchall)
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def rowfactory(self):
+        return self._cursor.rowfactory
+
+    @rowfactory.setter
+    def rowfactory(self, factory):
+        self._cursor.rowfactory = factory
+
+    def close(self):
+        self._cursor.close()
+
+class AsyncSQLiteConnection:
+    """Wraps a pooled SQLite connection for use from coroutines"""
+
+    def __init__(self, conn):
+        self.connection = conn
+
+    def cursor(self):
+        return AsyncSQLiteCursor(self.connection.cursor())
+
+class AsyncSQLitePool:
+    """Async acquire/release over the sync SQLite pool, for running the ASGI app without Oracle
+
+    sqlite3 has no asyncio driver, so statements run in worker threads; this
+    keeps the event loop free but does not add database concurrency.
+    """
+
+    def __init__(self, pool):
+        self._pool = pool
+        # Wait for a free connection on the event loop: a worker thread blocked
+        # in SQLitePool.acquire could starve the releases queued behind it
+        self._slots = asyncio.Semaphore(pool.max)
+
+    @asynccontextmanager
+    async def acquire(self):
+        async with self._slots:
+            conn = await asyncio.to_thread(self._pool.acquire)
+            try:
+                yield AsyncSQLiteConnection(conn)
+            finally:
+                await asyncio.to_thread(self._pool.release, conn)
+
+    async def close(self, force=False):
+        await asyncio.to_thread(self._pool.close, force)
+
+# ==================== ASYNC DATABASE ====================
+
+class AsyncDatabase:
+    """Coroutine counterpart of db.Database for the ASGI app
+
+    On Oracle this uses python-oracledb's asyncio pool (thin mode), so a
+    waiting query holds a pooled session but no thread.
+    """
+    _pool = None
+    _pool_lock = None
+
+    @staticmethod
+    def create_pool():
+        """Create the async session pool for the configured backend"""
+        backend = Database.backend()
+        if backend.name == 'sqlite':
+            return AsyncSQLitePool(backend.create_pool())
+        return oracledb.create_pool_async(**backend.pool_params())
+
+    @staticmethod
+    async def get_pool():
+        """Get or create the async session pool"""
+        if AsyncDatabase._pool is None:
+            if AsyncDatabase._pool_lock is None:
+                AsyncDatabase._pool_lock = asyncio.Lock()
+            async with AsyncDatabase._pool_lock:
+                if AsyncDatabase._pool is None:
+                    try:
+                        AsyncDatabase._pool = AsyncDatabase.create_pool()
+                        logger.info(f"Async database pool created (min={DB_CONFIG['pool_min']}, max={DB_CONFIG['pool_max']})")
+                    except Exception as e:
+                        logger.error(f"Error creating async database pool: {e}")
+                        raise
+        return AsyncDatabase._pool
+
+    @staticmethod
+    async def close_pool():
+        """Close the async session pool"""
+        if AsyncDatabase._pool is not None:
+            await AsyncDatabase._pool.close(force=True)
+            AsyncDatabase._pool = None
+            statement_cache.forget()
+            logger.info("Async database pool closed")
+
+    @staticmethod
+    async def execute_query(query, params=None, json_ready=False):
+        """Run a query on a pooled session and return its rows as dicts (see Database.execute_query)"""
+        pool = await AsyncDatabase.get_pool()
+        async with pool.acquire() as conn:
+            cursor = conn.cursor()
+            handler = Database.backend().output_type_handler
+            if json_ready and handler is not None:
+                cursor.outputtypehandler = handler
+            # Key the cache estimate on the pooled session, not the per-acquire SQLite wrapper
+            observe_statement(getattr(conn, 'connection', conn), query)
+            start = time.perf_counter()
+            try:
+                await cursor.execute(query, params or {})
+                result = []
+                if cursor.description:
+                    columns = tuple((desc[0], desc[1]) for desc in cursor.description)
+                    cursor.rowfactory = row_plan(columns, json_ready)
+                    result = await cursor.fetchall()
+                record_statement(query, time.perf_counter() - start, len(result))
+                return result
+            except Exception as e:
+                logger.error(f"Query error: {e}")
+                raise
+            finally:
+                cursor.close()
@@ -0,0 +1,50 @@
+"""gunicorn profile for the Flask app: gunicorn -c gunicorn.conf.py wsgi:app
+
+Worker processes and threads, recycling and timeouts come from config.py
+(SERVER_* environment variables). The app is imported once in the master
+and forked, so workers start fast and share its read-only memory. Each
+worker opens its own database session pool after the fork (see
+Database.reset_after_fork) and closes it when it exits.
+"""
+from config import (DB_CONFIG, SERVER_BIND, SERVER_WORKERS, SERVER_THREADS, SERVER_TIMEOUT, SERVER_GRACEFUL_TIMEOUT,
+                    SERVER_MAX_REQUESTS, SERVER_MAX_REQUESTS_JITTER, SERVER_KEEPALIVE)
+
+bind = SERVER_BIND
+workers = SERVER_WORKERS
+threads = SERVER_THREADS
+worker_class = 'gthread' if threads > 1 else 'sync'
+preload_app = True
+timeout = SERVER_TIMEOUT
+graceful_timeout = SERVER_GRACEFUL_TIMEOUT
+keepalive = SERVER_KEEPALIVE
+# Replace each worker after a few thousand requests, staggered by the jitter
+max_requests = SERVER_MAX_REQUESTS
+max_requests_jitter = SERVER_MAX_REQUESTS_JITTER
+accesslog = '-'
+
+def on_starting(server):
+    server.log.info(f"Starting {workers} workers x {threads} threads "
+                    f"(pool max {DB_CONFIG['pool_max']} sessions per worker, recycle after ~{max_requests} requests)")
+    if threads > DB_CONFIG['pool_max']:
+        server.log.warning(f"SERVER_THREADS ({threads}) exceeds DB_POOL_MAX ({DB_CONFIG['pool_max']}); requests will queue for sessions")
+
+def when_ready(server):
+    """Create and seed the SQLite stand-in once here, before the workers could race to do it"""
+    from db import Database
+    backend = Database.backend()
+    if backend.name == 'sqlite':
+        backend.connect().close()
+
+def post_worker_init(worker):
+    """Open this worker's session pool before it takes traffic"""
+    from db import Database
+    try:
+        Database.get_pool()
+    except Exception as e:
+        # Keep serving; the pool is retried on the first request and /readyz reports the failure
+        worker.log.warning(f"Worker {worker.pid}: database pool not ready: {e}")
+
+def worker_exit(server, worker):
+    """Log off this worker's sessions when it stops or is recycled"""
+    from db import Database
+    Database.close_connection()
@@ -0,0 +1,72 @@
+from config import IMAGE_VARIANTS, IMAGE_QUALITY
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+import hashlib
+import io
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+# WebP where Pillow was built with it, JPEG otherwise
+VARIANT_FORMAT = 'WEBP' if features.check('webp') else 'JPEG'
+VARIANT_EXTENSION = 'webp' if VARIANT_FORMAT == 'WEBP' else 'jpg'
+
+# Names produced by process_car_image: car_<sha256 prefix>[_<variant>].<ext>
+HASHED_NAME = re.compile(r'^car_[0-9a-f]{16}(?:_[a-z]+)?\.[a-z]+$')
+
+class InvalidImageError(ValueError):
+    """Raised when an upload is not a decodable image"""
+
+def process_car_image(file, upload_folder):
+    """Validate an uploaded image and write the original plus resized variants.
+
+    Filenames are derived from a hash of the file contents, so re-uploading the
+    same image reuses the existing files and browsers can cache them forever.
+    Returns (original_filename, {variant: (filename, width, height)}).
+    """
+    data = file.read()
+    digest = hashlib.sha256(data).hexdigest()[:16]
+
+    try:
+        with Image.open(io.BytesIO(data)) as probe:
+            probe.verify()
+        image = Image.open(io.BytesIO(data))
+        image.load()
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        raise InvalidImageError('Invalid image file') from e
+
+    original_ext = (image.format or 'jpeg').lower().replace('jpeg', 'jpg')
+    original = f'car_{digest}.{original_ext}'
+    original_path = os.path.join(upload_folder, original)
+    if not os.path.exists(original_path):
+        with open(original_path, 'wb') as f:
+            f.write(data)
+
+    # Apply EXIF rotation once so every variant is upright
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA') or (VARIANT_FORMAT == 'JPEG' and image.mode == 'RGBA'):
+        image = image.convert('RGB')
+
+    variants = {}
+    for name, width in IMAGE_VARIANTS.items():
+        filename = f'car_{digest}_{name}.{VARIANT_EXTENSION}'
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.LANCZOS)
+        else:
+            resized = image
+        path = os.path.join(upload_folder, filename)
+        if not os.path.exists(path):
+            if VARIANT_FORMAT == 'WEBP':
+                resized.save(path, VARIANT_FORMAT, quality=IMAGE_QUALITY, method=4)
+            else:
+                resized.save(path, VARIANT_FORMAT, quality=IMAGE_QUALITY, optimize=True, progressive=True)
+        variants[name] = (filename, resized.width, resized.height)
+
+    logger.info(f"Processed car image {original} into {len(variants)} variants")
+    return original, variants
+
+def is_content_hashed(filename):
+    """True for upload names that change whenever the file contents change"""
+    return HASHED_NAME.match(filename) is not None
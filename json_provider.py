@@ -0,0 +1,87 @@
+from config import JSON_GZIP_MIN_BYTES, JSON_GZIP_LEVEL
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+from datetime import date, datetime, time
+from decimal import Decimal
+import gzip
+import json
+import logging
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+def _default(value):
+    """Types neither encoder handles on its own"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    if hasattr(value, 'read'):  # Oracle LOB
+        return value.read()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider using orjson when it is installed and the stdlib json module otherwise
+
+    Decimals are written as numbers and dates as ISO-8601 strings. Keys keep
+    their query column order instead of being sorted.
+    """
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.dumps(obj, default=_default).decode()
+        kwargs.setdefault('default', _default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if orjson is None or self._app.debug or self.compact is False:
+            return super().response(obj)
+        # Skip the str round trip: orjson already produces UTF-8 bytes
+        return self._app.response_class(dumps_bytes(obj), mimetype=self.mimetype)
+
+def dumps_bytes(obj):
+    """Encode a JSON response body as UTF-8 bytes, newline-terminated like Flask's responses"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, default=_default) + '\n').encode()
+
+def gzip_response(response):
+    """Compress a JSON response when the client accepts gzip and the body is worth it"""
+    if (response.mimetype != 'application/json'
+            or response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or 'Content-Encoding' in response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+    if not request.accept_encodings['gzip']:
+        return response
+    body = response.get_data()
+    if len(body) < JSON_GZIP_MIN_BYTES:
+        return response
+    response.set_data(gzip.compress(body, compresslevel=JSON_GZIP_LEVEL, mtime=0))
+    response.headers['Content-Encoding'] = 'gzip'
+    # The compressed bytes are a different representation of the same entity
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+def init_app(app):
+    """Install the fast JSON provider and gzip negotiation for JSON responses"""
+    app.json = FastJSONProvider(app)
+    app.after_request(gzip_response)
+    logger.info(f"JSON encoder: {'orjson' if orjson is not None else 'stdlib json'}")
@@ -0,0 +1,185 @@
+from config import SQL_METRICS_ENABLED, SLOW_QUERY_MS, DB_CONFIG
+from flask import g, has_app_context
+from functools import lru_cache
+from collections import OrderedDict
+import logging
+import re
+import threading
+import time
+
+slow_logger = logging.getLogger('carola.slow_sql')
+
+# Histogram bucket upper bounds in milliseconds (the last bucket is open-ended)
+BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'(?<![\w:])\d+(?:\.\d+)?\b')
+_WHITESPACE = re.compile(r'\s+')
+
+@lru_cache(maxsize=1024)
+def normalize_sql(sql):
+    """Collapse whitespace and replace literals so identical statements group together"""
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+class StatementStats:
+    """Thread-safe per-statement timing histograms"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, sql, elapsed_ms, rows):
+        with self._lock:
+            stat = self._stats.get(sql)
+            if stat is None:
+                stat = self._stats[sql] = {
+                    'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'rows': 0,
+                    'buckets': [0] * (len(BUCKETS_MS) + 1)
+                }
+            stat['count'] += 1
+            stat['total_ms'] += elapsed_ms
+            stat['max_ms'] = max(stat['max_ms'], elapsed_ms)
+            stat['rows'] += rows
+            for i, bound in enumerate(BUCKETS_MS):
+                if elapsed_ms <= bound:
+                    stat['buckets'][i] += 1
+                    break
+            else:
+                stat['buckets'][-1] += 1
+
+    def snapshot(self):
+        """Return statements ordered by total time spent, most expensive first"""
+        with self._lock:
+            items = [(sql, dict(stat, buckets=list(stat['buckets']))) for sql, stat in self._stats.items()]
+        result = []
+        for sql, stat in sorted(items, key=lambda item: item[1]['total_ms'], reverse=True):
+            result.append({
+                'sql': sql,
+                'count': stat['count'],
+                'total_ms': round(stat['total_ms'], 3),
+                'avg_ms': round(stat['total_ms'] / stat['count'], 3),
+                'max_ms': round(stat['max_ms'], 3),
+                'rows': stat['rows'],
+                # Counts per BUCKETS_MS bound, plus a final bucket for anything slower
+                'histogram': stat['buckets']
+            })
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+statement_stats = StatementStats()
+
+class StatementCacheStats:
+    """Estimate driver statement cache hits by replaying each session's statements through an LRU
+
+    The driver keeps the last stmt_cache_size statements parsed per
+    session and only reuses one when the SQL text is identical, so an LRU
+    of the same size over the raw text predicts which executes skip the parse.
+    Sessions are identified by a key that survives pool release/acquire (see
+    the backends' session_key); the least recently used session's LRU is
+    discarded once more than max_sessions are tracked, which covers sessions
+    the pool closed on its own.
+    """
+
+    def __init__(self, size, max_sessions):
+        self.size = size
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._caches = OrderedDict()
+        self._stats = {}
+
+    def observe(self, session_key, sql):
+        if not SQL_METRICS_ENABLED:
+            return
+        with self._lock:
+            cache = self._caches.get(session_key)
+            if cache is None:
+                cache = self._caches[session_key] = OrderedDict()
+                if len(self._caches) > self.max_sessions:
+                    self._caches.popitem(last=False)
+            else:
+                self._caches.move_to_end(session_key)
+            hit = sql in cache
+            if hit:
+                cache.move_to_end(sql)
+            elif self.size > 0:
+                cache[sql] = True
+                if len(cache) > self.size:
+                    cache.popitem(last=False)
+            stat = self._stats.get(sql)
+            if stat is None:
+                stat = self._stats[sql] = {'executions': 0, 'hits': 0}
+            stat['executions'] += 1
+            stat['hits'] += hit
+
+    def forget(self, session_key=None):
+        """Drop a closed session's LRU, or every session's when session_key is None"""
+        with self._lock:
+            if session_key is None:
+                self._caches.clear()
+            else:
+                self._caches.pop(session_key, None)
+
+    def snapshot(self):
+        """Return per-statement executions and estimated hits, most executed first"""
+        with self._lock:
+            items = [(sql, dict(stat)) for sql, stat in self._stats.items()]
+        return [
+            {
+                'sql': sql,
+                'executions': stat['executions'],
+                'hits': stat['hits'],
+                'hit_ratio': round(stat['hits'] / stat['executions'], 3)
+            }
+            for sql, stat in sorted(items, key=lambda item: item[1]['executions'], reverse=True)
+        ]
+
+    def reset(self):
+        with self._lock:
+            self._caches.clear()
+            self._stats.clear()
+
+# A worker holds at most pool_max sessions in each of the sync and asyncio pools, plus the shared connection
+statement_cache = StatementCacheStats(DB_CONFIG['stmt_cache_size'], max_sessions=2 * DB_CONFIG['pool_max'] + 1)
+
+def record_statement(sql, elapsed, rows=0):
+    """Record one executed statement (elapsed in seconds) globally and for the current request"""
+    if not SQL_METRICS_ENABLED:
+        return
+    elapsed_ms = elapsed * 1000
+    normalized = normalize_sql(sql)
+    statement_stats.record(normalized, elapsed_ms, rows)
+    if has_app_context():
+        trace = g.get('_sql_trace')
+        if trace is None:
+            trace = g._sql_trace = []
+        trace.append({'sql': normalized, 'ms': round(elapsed_ms, 3), 'rows': rows})
+    if elapsed_ms >= SLOW_QUERY_MS:
+        slow_logger.warning(f"Slow query ({elapsed_ms:.1f} ms, {rows} rows): {normalized}")
+
+def request_trace():
+    """Statements recorded so far for the current request"""
+    return g.get('_sql_trace', []) if has_app_context() else []
+
+def init_app(app):
+    """Add a Server-Timing header with per-request database time to every response"""
+    if not SQL_METRICS_ENABLED:
+        return
+
+    @app.before_request
+    def start_timer():
+        g._request_start = time.perf_counter()
+
+    @app.after_request
+    def add_server_timing(response):
+        trace = request_trace()
+        db_ms = sum(entry['ms'] for entry in trace)
+        timings = [f'db;dur={db_ms:.2f};desc="{len(trace)} queries"']
+        if '_request_start' in g:
+            timings.append(f'app;dur={(time.perf_counter() - g._request_start) * 1000:.2f}')
+        response.headers.add('Server-Timing', ', '.join(timings))
+        return response
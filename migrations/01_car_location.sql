@@ -0,0 +1,31 @@
+-- ============================================================================
+-- MIGRATION: NORMALIZED CAR LOCATIONS
+-- Moves the comma-separated Car.available_locations list into Car_Location so
+-- location filters become an index probe instead of a LIKE scan over Car.
+-- Safe to run once on an existing database (after tablebaru.sql/databaru.sql).
+-- ============================================================================
+
+CREATE TABLE Car_Location (
+    car_id NUMBER NOT NULL,
+    location_name VARCHAR2(100) NOT NULL,
+    location_key VARCHAR2(100) NOT NULL,   -- UPPER(location_name), used for lookups
+    CONSTRAINT pk_car_location PRIMARY KEY (location_key, car_id),
+    CONSTRAINT fk_car_location_car FOREIGN KEY (car_id) REFERENCES Car(car_id)
+);
+
+CREATE INDEX idx_car_location_car ON Car_Location(car_id);
+
+-- Backfill from the existing comma-separated column
+INSERT INTO Car_Location (car_id, location_name, location_key)
+SELECT car_id, MIN(location_name), UPPER(location_name)
+FROM (
+    SELECT c.car_id, TRIM(REGEXP_SUBSTR(c.available_locations, '[^,]+', 1, n.idx)) AS location_name
+    FROM Car c
+    JOIN (SELECT LEVEL AS idx FROM dual CONNECT BY LEVEL <= 250) n
+      ON n.idx <= REGEXP_COUNT(c.available_locations, '[^,]+')
+    WHERE c.available_locations IS NOT NULL
+)
+WHERE location_name IS NOT NULL
+GROUP BY car_id, UPPER(location_name);
+
+COMMIT;
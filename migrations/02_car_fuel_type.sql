@@ -0,0 +1,23 @@
+-- ============================================================================
+-- MIGRATION: DENORMALIZED FUEL TYPE ON CAR
+-- Stores the fuel type on Car so listings read one column instead of probing
+-- Petrol, Diesel and Electric with correlated EXISTS subqueries per row.
+-- The admin routes keep it in step with the fuel subtables.
+-- ============================================================================
+
+ALTER TABLE Car ADD (
+    fuel_type VARCHAR2(10) DEFAULT 'N/A' NOT NULL,
+    CONSTRAINT chk_car_fuel_type CHECK (fuel_type IN ('Petrol', 'Diesel', 'Electric', 'N/A'))
+);
+
+-- Backfill from the fuel subtables
+UPDATE Car c SET fuel_type = CASE
+    WHEN EXISTS (SELECT 1 FROM Petrol WHERE car_id = c.car_id) THEN 'Petrol'
+    WHEN EXISTS (SELECT 1 FROM Diesel WHERE car_id = c.car_id) THEN 'Diesel'
+    WHEN EXISTS (SELECT 1 FROM Electric WHERE car_id = c.car_id) THEN 'Electric'
+    ELSE 'N/A'
+END;
+
+CREATE INDEX idx_car_fuel_type ON Car(fuel_type);
+
+COMMIT;
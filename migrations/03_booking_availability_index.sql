@@ -0,0 +1,9 @@
+-- ============================================================================
+-- MIGRATION: BOOKING AVAILABILITY INDEX
+-- Composite index for the per-car overlap check used by create_booking and
+-- the /api/cars?pickup_date=&dropoff_date= availability filter.
+-- ============================================================================
+
+CREATE INDEX idx_booking_car_dates ON Booking(car_id, pickup_date, dropoff_date);
+
+COMMIT;
@@ -0,0 +1,18 @@
+-- ============================================================================
+-- MIGRATION: CAR IMAGE VARIANTS
+-- Resized WebP/JPEG copies (thumb, card, detail) generated on upload, so list
+-- pages no longer download the full-size original for every car.
+-- Existing cars keep using Car.attachments until their image is re-uploaded.
+-- ============================================================================
+
+CREATE TABLE Car_Image (
+    car_id NUMBER NOT NULL,
+    variant VARCHAR2(20) NOT NULL,         -- thumb / card / detail (see IMAGE_VARIANTS)
+    filename VARCHAR2(255) NOT NULL,
+    width NUMBER NOT NULL,
+    height NUMBER NOT NULL,
+    CONSTRAINT pk_car_image PRIMARY KEY (car_id, variant),
+    CONSTRAINT fk_car_image_car FOREIGN KEY (car_id) REFERENCES Car(car_id)
+);
+
+COMMIT;
@@ -0,0 +1,15 @@
+-- ============================================================================
+-- MIGRATION: BOOKING CUSTOMER INDEX
+-- Serves the customer's own bookings list (cust_id, newest first) and the
+-- staff bookings view's customer filter with its (pickup_date, booking_id)
+-- keyset ordering. The customer filter matches a case-insensitive email
+-- prefix (LOWER(cust_email) LIKE 'ahmad%'), which the unique index on
+-- cust_email cannot serve, so it gets a function-based index of its own.
+-- Payment(booking_id) is already covered by Payment's primary key, so it
+-- needs no extra index.
+-- ============================================================================
+
+CREATE INDEX idx_booking_cust_dates ON Booking(cust_id, pickup_date, booking_id);
+CREATE INDEX idx_customer_email_lower ON Customer(LOWER(cust_email));
+
+COMMIT;
@@ -0,0 +1,14 @@
+-- ============================================================================
+-- MIGRATION: PASSWORD HASHES
+-- Passwords are now stored as salted werkzeug hashes (about 100 characters)
+-- and checked by the app. Existing plaintext passwords keep working and are
+-- replaced with a hash on each user's next login; to convert them all at
+-- once, run `flask --app app hash-passwords` after this script.
+-- Login looks accounts up by cust_username / staff_username, which are
+-- already covered by the unique indexes behind their UNIQUE constraints.
+-- ============================================================================
+
+ALTER TABLE Customer MODIFY (cust_password VARCHAR2(255));
+ALTER TABLE Staff MODIFY (staff_password VARCHAR2(255));
+
+COMMIT;
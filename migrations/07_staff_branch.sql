@@ -0,0 +1,16 @@
+-- ============================================================================
+-- MIGRATION: STAFF BRANCH
+-- New bookings go to the staff member with the fewest open bookings at the
+-- pickup location's branch, instead of always the first staff row.
+-- staff_branch holds the pickup location a staff member serves (matched
+-- case-insensitively); staff left NULL take bookings for every location.
+-- The index serves the per-staff open booking counts the app loads.
+-- ============================================================================
+
+ALTER TABLE Staff ADD (staff_branch VARCHAR2(100));
+
+CREATE INDEX idx_booking_staff_dates ON Booking(staff_id, dropoff_date);
+
+-- Example: UPDATE Staff SET staff_branch = 'Penang' WHERE staff_username = 'rajk';
+
+COMMIT;
@@ -0,0 +1,74 @@
+from config import PASSWORD_HASH_METHOD, AUTH_HASH_WORKERS, AUTH_HASH_QUEUE, AUTH_CACHE_SIZE, AUTH_CACHE_TTL
+from cache import LRUCache
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from werkzeug.security import generate_password_hash, check_password_hash
+import hashlib
+import hmac
+import itertools
+import os
+import threading
+
+# Hashing is CPU-bound (hashlib releases the GIL while it works), so it runs
+# on a small pool of its own. Request threads wait on the result; when more
+# than AUTH_HASH_QUEUE hashes are already waiting, new ones are refused
+# instead of piling up behind them.
+_executor = ThreadPoolExecutor(max_workers=AUTH_HASH_WORKERS, thread_name_prefix='password-hash')
+_slots = threading.BoundedSemaphore(AUTH_HASH_WORKERS + AUTH_HASH_QUEUE)
+
+# Successful checks keyed by a process-local HMAC of (stored hash, password),
+# so repeat logins skip the hash and a changed password never matches. Bounded
+# so a stream of distinct logins cannot grow it without limit.
+verified_cache = LRUCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL)
+_cache_secret = os.urandom(32)
+
+class HashPoolBusy(RuntimeError):
+    """Raised when too many password hashes are already queued"""
+
+def _run(func, *args):
+    if not _slots.acquire(blocking=False):
+        raise HashPoolBusy('Too many logins in progress, please try again')
+    try:
+        future = _executor.submit(func, *args)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return future.result()
+
+@lru_cache(maxsize=1)
+def _dummy_hash():
+    """Hash checked when no account matches, so unknown usernames take as long as wrong passwords"""
+    return generate_password_hash(os.urandom(16).hex(), PASSWORD_HASH_METHOD)
+
+def is_hashed(stored):
+    """True for values written by hash_password, False for legacy plaintext passwords"""
+    return stored.startswith(('pbkdf2:', 'scrypt:')) and stored.count('$') == 2
+
+def needs_rehash(stored):
+    """True when a stored password is plaintext or hashed with an older method"""
+    return not stored.startswith(PASSWORD_HASH_METHOD + '$')
+
+def hash_password(password):
+    """Salted hash of password for storing in cust_password/staff_password"""
+    return _run(generate_password_hash, password, PASSWORD_HASH_METHOD)
+
+def hash_passwords(passwords):
+    """Hash many passwords across the worker pool (for bulk migration, bypasses the queue limit)"""
+    return list(_executor.map(generate_password_hash, passwords, itertools.repeat(PASSWORD_HASH_METHOD)))
+
+def verify_password(stored, password):
+    """Check password against a stored hash or a legacy plaintext value (None: no such account)"""
+    if stored is None:
+        _run(check_password_hash, _dummy_hash(), password)
+        return False
+    if not is_hashed(stored):
+        return hmac.compare_digest(stored.encode(), password.encode())
+    
+    key = hmac.new(_cache_secret, f'{stored}\0{password}'.encode(), hashlib.sha256).digest()
+    if verified_cache.get(key):
+        return True
+    if _run(check_password_hash, stored, password):
+        verified_cache.set(key, True)
+        return True
+    return False
@@ -0,0 +1,72 @@
+from config import RATE_CACHE_TTL
+from cache import TTLCache
+from db import Database
+from statements import rates_statement, RATE_BATCH_SIZES
+
+def rental_days(pickup_date, dropoff_date):
+    """Days charged for a rental; pickup and drop-off days both count"""
+    if dropoff_date < pickup_date:
+        raise ValueError('Drop-off date must be on or after pickup date')
+    return (dropoff_date - pickup_date).days + 1
+
+def total_price(rate, days):
+    """Price of a rental at a daily rate"""
+    return round(float(rate) * days, 2)
+
+class RateCards:
+    """Daily rates by car_id, cached in memory and looked up in batches on a miss
+
+    admin_update_car and admin_delete_car invalidate a car's entry; the TTL
+    bounds staleness for rates changed by other workers or in the database.
+    Bookings are always priced from the rate read with the car row locked.
+    """
+
+    def __init__(self, ttl):
+        self._cache = TTLCache(ttl=ttl)
+
+    def get_many(self, car_ids):
+        """Rates for car_ids as {car_id: rate}; unknown cars are left out"""
+        rates = {}
+        missing = []
+        for car_id in dict.fromkeys(car_ids):
+            rate = self._cache.get(car_id)
+            if rate is None:
+                missing.append(car_id)
+            else:
+                rates[car_id] = rate
+        for car_id, rate in self._fetch(missing).items():
+            self._cache.set(car_id, rate)
+            rates[car_id] = rate
+        return rates
+
+    def _fetch(self, car_ids):
+        rates = {}
+        largest = RATE_BATCH_SIZES[-1]
+        for start in range(0, len(car_ids), largest):
+            chunk = car_ids[start:start + largest]
+            size = next(size for size in RATE_BATCH_SIZES if size >= len(chunk))
+            padded = chunk + [chunk[-1]] * (size - len(chunk))
+            rows = Database.execute_query(rates_statement(size), {f'id{i}': car_id for i, car_id in enumerate(padded)})
+            for row in rows:
+                rates[int(row['CAR_ID'])] = float(row['RATE'])
+        return rates
+
+    def set(self, car_id, rate):
+        """Record a rate read elsewhere (e.g. under a row lock)"""
+        self._cache.set(car_id, float(rate))
+
+    def invalidate(self, car_id=None):
+        """Forget one car's rate, or all of them"""
+        self._cache.invalidate(car_id)
+
+    def stats(self):
+        return self._cache.stats()
+
+rate_cards = RateCards(ttl=RATE_CACHE_TTL)
+
+def quote(car_ids, pickup_date, dropoff_date):
+    """Price each car for the dates as {car_id: {'car_id', 'rate', 'days', 'price'}}; unknown cars are left out"""
+    days = rental_days(pickup_date, dropoff_date)
+    rates = rate_cards.get_many(car_ids)
+    return {car_id: {'car_id': car_id, 'rate': rate, 'days': days, 'price': total_price(rate, days)}
+            for car_id, rate in rates.items()}
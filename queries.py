@@ -0,0 +1,288 @@
+"""Request parsing and response shaping for the read-heavy /api routes
+
+Shared by the Flask app (app.py) and the ASGI app (asgi.py), so both send the
+same statements and binds for a query string and return the same JSON. Nothing
+here touches the database: query-string arguments become (statement, binds)
+pairs, and fetched rows become response bodies.
+"""
+from config import FUEL_TYPES, CARS_PAGE_MAX, BOOKINGS_PAGE_MAX
+from statements import sql, cars_statement, cars_count_statement, CAR_FILTER_BINDS
+from datetime import datetime, timedelta, timezone
+import base64
+import hashlib
+import json
+
+class InvalidQuery(ValueError):
+    """Raised for query-string problems reported to the client as a 400"""
+
+# ==================== PAGING ====================
+
+def parse_limit(value, maximum):
+    """Parse a page size, capping it at maximum (None when not given)"""
+    if not value:
+        return None
+    limit = int(value)
+    if limit <= 0:
+        raise ValueError('limit must be positive')
+    return min(limit, maximum)
+
+def encode_cursor(*values):
+    """Encode keyset values as an opaque, URL-safe page cursor"""
+    raw = json.dumps(list(values), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Decode a page cursor produced by encode_cursor"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list):
+        raise ValueError('Invalid cursor')
+    return values
+
+def count_query(query):
+    """COUNT(*) over a listing query, for clients that ask for a total"""
+    return "SELECT COUNT(*) as cnt FROM (" + query + ")"
+
+# ==================== CARS ====================
+
+def cars_queries(args):
+    """Plan /api/cars for args: (count query or None, listing query, page limit)
+
+    Each query is a (statement, binds) pair; the count is only planned when
+    the client sends include_total=1.
+    """
+    location = args.get('location', '')
+    car_type = args.get('type', '')
+    brand = args.get('brand', '')
+    fuel_type = args.get('fuel_type', '')
+    seats = args.get('seats', '')
+    bags = args.get('bags', '')
+    min_price = args.get('min_price', '')
+    max_price = args.get('max_price', '')
+    pickup_date = args.get('pickup_date', '')
+    dropoff_date = args.get('dropoff_date', '')
+
+    # Availability window: both dates, pickup not after drop-off
+    if pickup_date or dropoff_date:
+        try:
+            pickup_date = datetime.strptime(pickup_date, '%Y-%m-%d')
+            dropoff_date = datetime.strptime(dropoff_date, '%Y-%m-%d')
+            if dropoff_date < pickup_date:
+                raise ValueError('drop-off before pickup')
+        except ValueError:
+            raise InvalidQuery('Invalid pickup_date/dropoff_date')
+
+    # Paging: limit/offset, or an opaque keyset cursor over (rate, car_id)
+    try:
+        limit = parse_limit(args.get('limit', ''), CARS_PAGE_MAX)
+        offset = int(args.get('offset', 0) or 0)
+        cursor = args.get('cursor', '')
+        after = None
+        if cursor:
+            after_rate, after_id = decode_cursor(cursor)
+            after = (float(after_rate), int(after_id))
+        if offset < 0:
+            raise ValueError('offset must not be negative')
+    except (TypeError, ValueError):
+        raise InvalidQuery('Invalid pagination parameters')
+
+    # Unused filters are bound as NULL so the statement text stays the same
+    params = dict.fromkeys(CAR_FILTER_BINDS)
+
+    if location:
+        params['location'] = location.strip().upper()
+
+    try:
+        if car_type:
+            params['car_type'] = int(car_type)
+
+        if brand:
+            params['brand'] = int(brand)
+
+        if seats:
+            params['seats'] = int(seats)
+
+        if bags:
+            params['bags'] = int(bags)
+
+        if min_price:
+            params['min_price'] = float(min_price)
+
+        if max_price:
+            params['max_price'] = float(max_price)
+    except ValueError:
+        raise InvalidQuery('Invalid filter parameters')
+
+    if fuel_type in FUEL_TYPES:
+        params['fuel_type'] = fuel_type
+
+    if pickup_date:
+        params['pickup_date'] = pickup_date
+        params['dropoff_date'] = dropoff_date
+
+    # Total across all pages costs an extra COUNT, so clients opt in
+    count = None
+    if args.get('include_total') == '1':
+        count = (cars_count_statement(bool(location), bool(pickup_date)), dict(params))
+
+    if after is not None:
+        params['after_rate'], params['after_id'] = after
+
+    if limit:
+        # Fetch one extra row to know whether another page exists
+        paging = 'page'
+        params['offset'] = 0 if after is not None else offset
+        params['fetch_rows'] = limit + 1
+    elif offset and after is None:
+        paging = 'offset'
+        params['offset'] = offset
+    else:
+        paging = 'all'
+
+    return count, (cars_statement(bool(location), bool(pickup_date), after is not None, paging), params), limit
+
+def cars_response(cars, limit, total, add_image_url):
+    """Build the /api/cars body from the fetched page (limit + 1 rows when paging)"""
+    next_cursor = None
+    if limit and len(cars) > limit:
+        cars = cars[:limit]
+        next_cursor = encode_cursor(cars[-1]['RATE'], cars[-1]['CAR_ID'])
+
+    for car in cars:
+        add_image_url(car)
+
+    response = {'success': True, 'cars': cars}
+    if limit:
+        response['next_cursor'] = next_cursor
+    if total is not None:
+        response['total'] = total
+    return response
+
+# ==================== BOOKINGS ====================
+
+def staff_bookings_query(args):
+    """Build the staff bookings query for the date window, payment status, car and customer filters in args"""
+    query = """
+        SELECT b.booking_id, b.pickup_date, b.dropoff_date, b.pickup_location, b.dropoff_location, b.price,
+               c.car_id, m.model_name, br.brand_name, c.colour, c.rate,
+               cu.cust_fname || ' ' || cu.cust_lname as customer_name, cu.cust_email, cu.cust_phone,
+               CASE WHEN p.booking_id IS NOT NULL THEN 'Paid' ELSE 'Pending' END as payment_status
+        FROM Booking b
+        JOIN Car c ON b.car_id = c.car_id
+        JOIN Model m ON c.model_id = m.model_id
+        JOIN Brand br ON m.brand_id = br.brand_id
+        JOIN Customer cu ON b.cust_id = cu.cust_id
+        LEFT JOIN Payment p ON b.booking_id = p.booking_id
+        WHERE 1=1
+    """
+    params = {}
+
+    # Pickup date window, both ends inclusive
+    date_from = args.get('date_from', '')
+    date_to = args.get('date_to', '')
+    if date_from:
+        query += " AND b.pickup_date >= :date_from"
+        params['date_from'] = datetime.strptime(date_from, '%Y-%m-%d')
+    if date_to:
+        query += " AND b.pickup_date < :date_to"
+        params['date_to'] = datetime.strptime(date_to, '%Y-%m-%d') + timedelta(days=1)
+
+    status = args.get('status', '')
+    if status == 'Paid':
+        query += " AND p.booking_id IS NOT NULL"
+    elif status == 'Pending':
+        query += " AND p.booking_id IS NULL"
+    elif status:
+        raise ValueError('status must be Paid or Pending')
+
+    car_id = args.get('car_id', '')
+    if car_id:
+        query += " AND b.car_id = :car_id"
+        params['car_id'] = int(car_id)
+
+    cust_id = args.get('cust_id', '')
+    if cust_id:
+        query += " AND b.cust_id = :cust_id"
+        params['cust_id'] = int(cust_id)
+
+    # Customer email prefix, e.g. "ahmad" or "ahmad.ismail@"
+    customer = args.get('customer', '').strip()
+    if customer:
+        query += " AND LOWER(cu.cust_email) LIKE :customer"
+        params['customer'] = customer.lower().replace('%', '').replace('_', '') + '%'
+
+    return query, params
+
+def my_bookings_queries(user_type, user_id, args):
+    """Plan /api/my-bookings: (count query or None, listing query, page limit)
+
+    Customers get their own bookings; staff get the filtered view with
+    optional keyset paging over (pickup_date, booking_id).
+    """
+    if user_type == 'customer':
+        return None, (sql('bookings.customer'), {'user_id': user_id}), None
+
+    try:
+        query, params = staff_bookings_query(args)
+        limit = parse_limit(args.get('limit', ''), BOOKINGS_PAGE_MAX)
+        descending = args.get('order', 'desc') != 'asc'
+        cursor = args.get('cursor', '')
+        after = None
+        if cursor:
+            after_date, after_id = decode_cursor(cursor)
+            after = (datetime.fromisoformat(after_date), int(after_id))
+    except (TypeError, ValueError):
+        raise InvalidQuery('Invalid booking filters')
+
+    count = None
+    if args.get('include_total') == '1':
+        count = (count_query(query), dict(params))
+
+    op, direction = ('<', 'DESC') if descending else ('>', 'ASC')
+    if after is not None:
+        query += f" AND (b.pickup_date {op} :after_date OR (b.pickup_date = :after_date AND b.booking_id {op} :after_id))"
+        params['after_date'], params['after_id'] = after
+    query += f" ORDER BY b.pickup_date {direction}, b.booking_id {direction}"
+    if limit:
+        # One extra row tells us whether there is another page
+        query += " FETCH FIRST :fetch_rows ROWS ONLY"
+        params['fetch_rows'] = limit + 1
+    return count, (query, params), limit
+
+def bookings_response(bookings, limit, total):
+    """Build the /api/my-bookings body from the fetched page"""
+    response = {'success': True, 'bookings': bookings}
+    if limit:
+        next_cursor = None
+        if len(bookings) > limit:
+            bookings = response['bookings'] = bookings[:limit]
+            next_cursor = encode_cursor(bookings[-1]['PICKUP_DATE'], bookings[-1]['BOOKING_ID'])
+        response['next_cursor'] = next_cursor
+    if total is not None:
+        response['total'] = total
+    return response
+
+# ==================== FILTERS ====================
+
+# Statements behind /api/filters, in the order filters_payload takes their rows
+FILTER_QUERIES = ('filters.brands', 'filters.types', 'filters.locations', 'filters.seats', 'filters.bags')
+
+def filters_payload(brands, types, locations, seats, bags):
+    """Shape the FILTER_QUERIES results into the filter options shown on the cars and admin pages"""
+    return {
+        'brands': brands,
+        'types': types,
+        'locations': [{'location': row['LOCATION_NAME']} for row in locations],
+        'seats': [{'seat': int(row['SEAT'])} for row in seats],
+        'bags': [{'bag': int(row['SUITCASE'])} for row in bags]
+    }
+
+def filters_entry(filters):
+    """Cache entry for /api/filters: the payload with its ETag and Last-Modified time"""
+    return {
+        'filters': filters,
+        'etag': hashlib.md5(json.dumps(filters, sort_keys=True, default=str).encode()).hexdigest(),
+        'last_modified': datetime.now(timezone.utc).replace(microsecond=0)
+    }
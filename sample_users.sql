@@ -0,0 +1,21 @@
+-- ============================================================================
+-- SAMPLE CUSTOMER AND STAFF ACCOUNTS
+-- The test accounts listed in README.md / SETUP.md.
+-- Run this AFTER creating the tables (tablebaru.sql)
+-- ============================================================================
+
+INSERT INTO Customer (cust_fname, cust_lname, cust_age, cust_email, cust_phone, cust_username, cust_password)
+VALUES ('Ahmad', 'Ismail', 28, 'ahmad.ismail@example.com', '012-3456789', 'ahmadi', 'password123');
+INSERT INTO Customer (cust_fname, cust_lname, cust_age, cust_email, cust_phone, cust_username, cust_password)
+VALUES ('Siti', 'Aminah', 32, 'siti.aminah@example.com', '013-4567890', 'sitia', 'password123');
+INSERT INTO Customer (cust_fname, cust_lname, cust_age, cust_email, cust_phone, cust_username, cust_password)
+VALUES ('Lim', 'Wei Ming', 25, 'lim.weiming@example.com', '014-5678901', 'limwm', 'password123');
+
+INSERT INTO Staff (staff_fname, staff_lname, staff_email, staff_phone, staff_dept, staff_username, staff_password)
+VALUES ('Nurul', 'Huda', 'nurul.huda@carola.example.com', '03-12345678', 'Operations', 'nurulh', 'staff123');
+INSERT INTO Staff (staff_fname, staff_lname, staff_email, staff_phone, staff_dept, staff_username, staff_password)
+VALUES ('Raj', 'Kumar', 'raj.kumar@carola.example.com', '03-23456789', 'Customer Service', 'rajk', 'staff123');
+INSERT INTO Staff (staff_fname, staff_lname, staff_email, staff_phone, staff_dept, staff_username, staff_password)
+VALUES ('Chan', 'Li Ying', 'chan.liying@carola.example.com', '03-34567890', 'Fleet', 'chanly', 'staff123');
+
+COMMIT;
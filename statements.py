@@ -0,0 +1,361 @@
+"""Named SQL statements used by the routes
+
+Each statement is defined once here with fixed text and bind names, so every
+request sends Oracle byte-identical SQL. The driver's statement cache
+(DB_CONFIG['stmt_cache_size']) and the server's shared cursors can then reuse
+the parsed statement instead of parsing fresh text on every call.
+"""
+import itertools
+
+# Resized image variant for a car row (see images.process_car_image)
+_CAR_IMAGE = "(SELECT ci.filename FROM Car_Image ci WHERE ci.car_id = c.car_id AND ci.variant = '{variant}') as image_file"
+
+_CAR_DETAIL = """
+    SELECT c.car_id, c.rate, c.description, c.door, c.suitcase, c.seat, c.colour,
+           c.pickup_location, c.dropoff_location, c.available_locations, c.allows_different_dropoff,
+           c.attachments,
+           m.model_id, m.model_name, b.brand_id, b.brand_name, ct.carType_id, ct.carType_name,
+           c.fuel_type,
+           """ + _CAR_IMAGE.format(variant='detail') + """,
+           p.octane_rating, p.fuel_tank_capacity as petrol_tank,
+           d.diesel_emission, d.fuel_tank_capacity as diesel_tank,
+           e.battery_range, e.charging_rate_kw, e.last_charging_date
+    FROM Car c
+    JOIN Model m ON c.model_id = m.model_id
+    JOIN Brand b ON m.brand_id = b.brand_id
+    JOIN CarType ct ON c.carType_id = ct.carType_id
+    LEFT JOIN Petrol p ON c.car_id = p.car_id
+    LEFT JOIN Diesel d ON c.car_id = d.car_id
+    LEFT JOIN Electric e ON c.car_id = e.car_id
+    WHERE c.car_id = :car_id
+"""
+
+STATEMENTS = {
+    # Accounts
+    'customer.insert': """
+        INSERT INTO Customer (cust_fname, cust_lname, cust_age, cust_email, cust_phone, cust_username, cust_password)
+        VALUES (:fname, :lname, :age, :email, :phone, :username, :password)
+    """,
+    # Both account tables in one round trip, each probed through its unique
+    # username index; customers sort first if a username exists in both
+    'account.by_username': """
+        SELECT 'customer' as user_type, cust_id as user_id, cust_username as username,
+               cust_fname as fname, cust_lname as lname, NULL as dept, cust_password as password_hash
+        FROM Customer WHERE cust_username = :username
+        UNION ALL
+        SELECT 'staff', staff_id, staff_username, staff_fname, staff_lname, staff_dept, staff_password
+        FROM Staff WHERE staff_username = :username
+        ORDER BY 1
+    """,
+    'customer.set_password': "UPDATE Customer SET cust_password = :password_hash WHERE cust_id = :user_id",
+    'staff.set_password': "UPDATE Staff SET staff_password = :password_hash WHERE staff_id = :user_id",
+    'customer.passwords': "SELECT cust_id as user_id, cust_password as password_hash FROM Customer",
+    'staff.passwords': "SELECT staff_id as user_id, staff_password as password_hash FROM Staff",
+    # Open (not yet returned) bookings per staff member, for assignment.StaffLoad
+    'staff.load': """
+        SELECT s.staff_id, s.staff_branch, COUNT(b.booking_id) as open_bookings
+        FROM Staff s
+        LEFT JOIN Booking b ON b.staff_id = s.staff_id AND b.dropoff_date >= :today
+        GROUP BY s.staff_id, s.staff_branch
+    """,
+
+    # Cars
+    'car.detail': _CAR_DETAIL,
+    'car.insert': """
+        INSERT INTO Car (model_id, carType_id, rate, description, door, suitcase, seat, colour,
+                         attachments, pickup_location, dropoff_location, available_locations, allows_different_dropoff,
+                         fuel_type)
+        VALUES (:model_id, :carType_id, :rate, :description, :door, :suitcase, :seat, :colour,
+                :attachments, :pickup_location, :dropoff_location, :available_locations, :allows_different_dropoff,
+                :fuel_type)
+        RETURNING car_id INTO :car_id
+    """,
+    # A NULL :attachments keeps the current image
+    'car.update': """
+        UPDATE Car SET model_id = :model_id, carType_id = :carType_id, rate = :rate,
+                       description = :description, door = :door, suitcase = :suitcase, seat = :seat,
+                       colour = :colour, attachments = COALESCE(:attachments, attachments),
+                       pickup_location = :pickup_location, dropoff_location = :dropoff_location,
+                       available_locations = :available_locations, allows_different_dropoff = :allows_different_dropoff,
+                       fuel_type = :fuel_type
+        WHERE car_id = :car_id
+    """,
+    'car.lock_rate': "SELECT rate FROM Car WHERE car_id = :car_id FOR UPDATE",
+    'car.set_attachment': "UPDATE Car SET attachments = :filename WHERE car_id = :car_id",
+    'car.booking_count': "SELECT COUNT(*) as cnt FROM Booking WHERE car_id = :car_id",
+    'car.delete': "DELETE FROM Car WHERE car_id = :car_id",
+    'admin.cars': """
+        SELECT c.car_id, c.rate, c.description, c.door, c.suitcase, c.seat, c.colour,
+               c.attachments, c.pickup_location, c.dropoff_location, c.available_locations,
+               m.model_id, m.model_name, b.brand_id, b.brand_name, ct.carType_id, ct.carType_name,
+               c.fuel_type,
+               """ + _CAR_IMAGE.format(variant='thumb') + """
+        FROM Car c
+        JOIN Model m ON c.model_id = m.model_id
+        JOIN Brand b ON m.brand_id = b.brand_id
+        JOIN CarType ct ON c.carType_id = ct.carType_id
+        ORDER BY c.car_id DESC
+    """,
+    'car_location.delete': "DELETE FROM Car_Location WHERE car_id = :car_id",
+    'car_location.insert': "INSERT INTO Car_Location (car_id, location_name, location_key) VALUES (:car_id, :location_name, :location_key)",
+    'car_image.delete': "DELETE FROM Car_Image WHERE car_id = :car_id",
+    'car_image.insert': "INSERT INTO Car_Image (car_id, variant, filename, width, height) VALUES (:car_id, :variant, :filename, :width, :height)",
+
+    # Fuel subtype rows
+    'petrol.insert': """
+        INSERT INTO Petrol (car_id, octane_rating, fuel_tank_capacity)
+        VALUES (:car_id, :octane_rating, :fuel_tank_capacity)
+    """,
+    'diesel.insert': """
+        INSERT INTO Diesel (car_id, diesel_emission, fuel_tank_capacity)
+        VALUES (:car_id, :diesel_emission, :fuel_tank_capacity)
+    """,
+    'electric.insert': """
+        INSERT INTO Electric (car_id, battery_range, charging_rate_kw, last_charging_date)
+        VALUES (:car_id, :battery_range, :charging_rate_kw, TO_DATE(:last_charging_date, 'YYYY-MM-DD'))
+    """,
+    # Upserts for editing a car, so an unchanged fuel type is a single statement
+    'petrol.merge': """
+        MERGE INTO Petrol t
+        USING (SELECT :car_id AS car_id FROM dual) s
+        ON (t.car_id = s.car_id)
+        WHEN MATCHED THEN UPDATE SET octane_rating = :octane_rating, fuel_tank_capacity = :fuel_tank_capacity
+        WHEN NOT MATCHED THEN INSERT (car_id, octane_rating, fuel_tank_capacity)
+            VALUES (:car_id, :octane_rating, :fuel_tank_capacity)
+    """,
+    'diesel.merge': """
+        MERGE INTO Diesel t
+        USING (SELECT :car_id AS car_id FROM dual) s
+        ON (t.car_id = s.car_id)
+        WHEN MATCHED THEN UPDATE SET diesel_emission = :diesel_emission, fuel_tank_capacity = :fuel_tank_capacity
+        WHEN NOT MATCHED THEN INSERT (car_id, diesel_emission, fuel_tank_capacity)
+            VALUES (:car_id, :diesel_emission, :fuel_tank_capacity)
+    """,
+    'electric.merge': """
+        MERGE INTO Electric t
+        USING (SELECT :car_id AS car_id FROM dual) s
+        ON (t.car_id = s.car_id)
+        WHEN MATCHED THEN UPDATE SET battery_range = :battery_range, charging_rate_kw = :charging_rate_kw,
+                                     last_charging_date = TO_DATE(:last_charging_date, 'YYYY-MM-DD')
+        WHEN NOT MATCHED THEN INSERT (car_id, battery_range, charging_rate_kw, last_charging_date)
+            VALUES (:car_id, :battery_range, :charging_rate_kw, TO_DATE(:last_charging_date, 'YYYY-MM-DD'))
+    """,
+    'petrol.delete': "DELETE FROM Petrol WHERE car_id = :car_id",
+    'diesel.delete': "DELETE FROM Diesel WHERE car_id = :car_id",
+    'electric.delete': "DELETE FROM Electric WHERE car_id = :car_id",
+
+    # Filter options
+    'filters.brands': "SELECT brand_id, brand_name FROM Brand ORDER BY brand_name",
+    'filters.types': "SELECT carType_id, carType_name FROM CarType ORDER BY carType_name",
+    'filters.locations': """
+        SELECT MIN(location_name) as location_name FROM Car_Location
+        GROUP BY location_key ORDER BY location_key
+    """,
+    'filters.seats': "SELECT DISTINCT seat FROM Car WHERE seat IS NOT NULL ORDER BY seat",
+    'filters.bags': "SELECT DISTINCT suitcase FROM Car WHERE suitcase IS NOT NULL ORDER BY suitcase",
+    'models.by_brand': "SELECT model_id, model_name FROM Model WHERE brand_id = :brand_id ORDER BY model_name",
+    'brand.insert': "INSERT INTO Brand (brand_name) VALUES (:brand_name)",
+    'model.insert': "INSERT INTO Model (model_name, brand_id) VALUES (:model_name, :brand_id)",
+
+    # Bookings and payments
+    'booking.conflicts': """
+        SELECT COUNT(*) FROM Booking
+        WHERE car_id = :car_id
+        AND pickup_date <= :dropoff_date AND dropoff_date >= :pickup_date
+    """,
+    'booking.insert': """
+        INSERT INTO Booking (cust_id, staff_id, car_id, pickup_date, dropoff_date, pickup_location, dropoff_location, price)
+        VALUES (:cust_id, :staff_id, :car_id, :pickup_date, :dropoff_date, :pickup_location, :dropoff_location, :price)
+        RETURNING booking_id INTO :booking_id
+    """,
+    'bookings.customer': """
+        SELECT b.booking_id, b.pickup_date, b.dropoff_date, b.pickup_location, b.dropoff_location, b.price,
+               c.car_id, m.model_name, br.brand_name, c.colour, c.rate,
+               CASE WHEN p.booking_id IS NOT NULL THEN 'Paid' ELSE 'Pending' END as payment_status
+        FROM Booking b
+        JOIN Car c ON b.car_id = c.car_id
+        JOIN Model m ON c.model_id = m.model_id
+        JOIN Brand br ON m.brand_id = br.brand_id
+        LEFT JOIN Payment p ON b.booking_id = p.booking_id
+        WHERE b.cust_id = :user_id
+        ORDER BY b.pickup_date DESC
+    """,
+    'booking.price_for_customer': "SELECT price FROM Booking WHERE booking_id = :booking_id AND cust_id = :cust_id",
+    'payment.exists': "SELECT booking_id FROM Payment WHERE booking_id = :booking_id",
+    'payment.insert': """
+        INSERT INTO Payment (booking_id, amount, payment_date)
+        VALUES (:booking_id, :amount, SYSDATE)
+    """,
+
+    # Admin dashboard aggregates (stats.fleet_stats)
+    'stats.payment_status': """
+        SELECT CASE WHEN p.booking_id IS NOT NULL THEN 'Paid' ELSE 'Pending' END as status,
+               COUNT(*) as bookings, COALESCE(SUM(b.price), 0) as amount
+        FROM Booking b
+        LEFT JOIN Payment p ON b.booking_id = p.booking_id
+        GROUP BY CASE WHEN p.booking_id IS NOT NULL THEN 'Paid' ELSE 'Pending' END
+    """,
+    'stats.revenue_by_month': """
+        SELECT TO_CHAR(b.pickup_date, 'YYYY-MM') as period, COUNT(*) as bookings,
+               COALESCE(SUM(b.price), 0) as revenue, COALESCE(SUM(p.amount), 0) as paid
+        FROM Booking b
+        LEFT JOIN Payment p ON b.booking_id = p.booking_id
+        WHERE b.pickup_date >= :since
+        GROUP BY TO_CHAR(b.pickup_date, 'YYYY-MM')
+        ORDER BY period
+    """,
+    'stats.revenue_by_brand': """
+        SELECT br.brand_name, COUNT(*) as bookings,
+               COALESCE(SUM(b.price), 0) as revenue, COALESCE(SUM(p.amount), 0) as paid
+        FROM Booking b
+        JOIN Car c ON b.car_id = c.car_id
+        JOIN Model m ON c.model_id = m.model_id
+        JOIN Brand br ON m.brand_id = br.brand_id
+        LEFT JOIN Payment p ON b.booking_id = p.booking_id
+        WHERE b.pickup_date >= :since
+        GROUP BY br.brand_name
+        ORDER BY revenue DESC, br.brand_name
+    """,
+    # Rented days inside [window_start, window_end], both ends inclusive
+    'stats.fleet_utilization': """
+        SELECT (SELECT COUNT(*) FROM Car) as cars,
+               COALESCE(SUM(LEAST(b.dropoff_date, :window_end) - GREATEST(b.pickup_date, :window_start) + 1), 0) as booked_days
+        FROM Booking b
+        WHERE b.pickup_date <= :window_end AND b.dropoff_date >= :window_start
+    """,
+    'stats.car_utilization': """
+        SELECT c.car_id, m.model_name, br.brand_name, COUNT(b.booking_id) as bookings,
+               COALESCE(SUM(LEAST(b.dropoff_date, :window_end) - GREATEST(b.pickup_date, :window_start) + 1), 0) as booked_days
+        FROM Car c
+        JOIN Model m ON c.model_id = m.model_id
+        JOIN Brand br ON m.brand_id = br.brand_id
+        LEFT JOIN Booking b ON b.car_id = c.car_id
+             AND b.pickup_date <= :window_end AND b.dropoff_date >= :window_start
+        GROUP BY c.car_id, m.model_name, br.brand_name
+        ORDER BY booked_days DESC, c.car_id
+        OFFSET :offset ROWS FETCH NEXT :fetch_rows ROWS ONLY
+    """,
+    'stats.car_count': "SELECT COUNT(*) as cnt FROM Car",
+    'stats.upcoming_count': "SELECT COUNT(*) as cnt FROM Booking WHERE pickup_date >= :today AND pickup_date < :until",
+    'stats.upcoming_pickups': """
+        SELECT b.booking_id, b.pickup_date, b.pickup_location, c.car_id, m.model_name, br.brand_name,
+               cu.cust_fname || ' ' || cu.cust_lname as customer_name,
+               CASE WHEN p.booking_id IS NOT NULL THEN 'Paid' ELSE 'Pending' END as payment_status
+        FROM Booking b
+        JOIN Car c ON b.car_id = c.car_id
+        JOIN Model m ON c.model_id = m.model_id
+        JOIN Brand br ON m.brand_id = br.brand_id
+        JOIN Customer cu ON b.cust_id = cu.cust_id
+        LEFT JOIN Payment p ON b.booking_id = p.booking_id
+        WHERE b.pickup_date >= :today AND b.pickup_date < :until
+        ORDER BY b.pickup_date, b.booking_id
+        FETCH FIRST :top ROWS ONLY
+    """,
+}
+
+# ==================== CAR LISTING SHAPES ====================
+
+# /api/cars filters on cheap, low-selectivity columns are always part of the
+# statement and switched off with NULL binds, so they never change its text.
+# Only the selective filters (location, availability window) and the paging
+# mode pick a different shape, which bounds /api/cars to a handful of
+# statements instead of one per combination of query-string parameters.
+CAR_FILTER_BINDS = ('car_type', 'brand', 'fuel_type', 'seats', 'bags', 'min_price', 'max_price')
+CAR_PAGING_MODES = ('all', 'page', 'offset')
+
+_CARS_SELECT = """
+    SELECT c.car_id, c.rate, c.description, c.door, c.suitcase, c.seat, c.colour,
+           c.pickup_location, c.dropoff_location, c.available_locations, c.allows_different_dropoff,
+           c.attachments,
+           m.model_name, b.brand_name, ct.carType_name,
+           c.fuel_type,
+           """ + _CAR_IMAGE.format(variant='card')
+
+_CARS_FROM = """
+    FROM Car c
+    JOIN Model m ON c.model_id = m.model_id
+    JOIN Brand b ON m.brand_id = b.brand_id
+    JOIN CarType ct ON c.carType_id = ct.carType_id
+    WHERE (:car_type IS NULL OR ct.carType_id = :car_type)
+    AND (:brand IS NULL OR b.brand_id = :brand)
+    AND (:fuel_type IS NULL OR c.fuel_type = :fuel_type)
+    AND (:seats IS NULL OR c.seat = :seats)
+    AND (:bags IS NULL OR c.suitcase = :bags)
+    AND (:min_price IS NULL OR c.rate >= :min_price)
+    AND (:max_price IS NULL OR c.rate <= :max_price)
+"""
+
+# Probes the Car_Location primary key (location_key, car_id)
+_CARS_BY_LOCATION = " AND EXISTS (SELECT 1 FROM Car_Location cl WHERE cl.location_key = :location AND cl.car_id = c.car_id)"
+
+# Anti-join on Booking(car_id, pickup_date, dropoff_date)
+_CARS_AVAILABLE = """ AND NOT EXISTS (SELECT 1 FROM Booking bk WHERE bk.car_id = c.car_id
+                    AND bk.pickup_date <= :dropoff_date AND bk.dropoff_date >= :pickup_date)"""
+
+_CARS_AFTER = " AND (c.rate > :after_rate OR (c.rate = :after_rate AND c.car_id > :after_id))"
+
+_CARS_PAGING = {
+    'all': "",
+    # Fetch one extra row to know whether another page exists
+    'page': " OFFSET :offset ROWS FETCH NEXT :fetch_rows ROWS ONLY",
+    'offset': " OFFSET :offset ROWS",
+}
+
+def _cars_shape_name(location, available, keyset, paging):
+    flags = [flag for flag, on in (('location', location), ('available', available), ('keyset', keyset)) if on]
+    return f"cars.list[{','.join(flags + [paging])}]"
+
+def _cars_count_name(location, available):
+    flags = [flag for flag, on in (('location', location), ('available', available)) if on]
+    return f"cars.count[{','.join(flags)}]"
+
+for _location, _available in itertools.product((False, True), repeat=2):
+    _conditions = (_CARS_BY_LOCATION if _location else '') + (_CARS_AVAILABLE if _available else '')
+    STATEMENTS[_cars_count_name(_location, _available)] = "SELECT COUNT(*) as cnt" + _CARS_FROM + _conditions
+    for _keyset, _paging in itertools.product((False, True), CAR_PAGING_MODES):
+        if _keyset and _paging == 'offset':
+            continue  # a cursor replaces the offset
+        STATEMENTS[_cars_shape_name(_location, _available, _keyset, _paging)] = (
+            _CARS_SELECT + _CARS_FROM + _conditions + (_CARS_AFTER if _keyset else '')
+            + " ORDER BY c.rate, c.car_id" + _CARS_PAGING[_paging]
+        )
+
+def cars_statement(location, available, keyset, paging):
+    """Registered /api/cars statement for the given filter shape and paging mode"""
+    return STATEMENTS[_cars_shape_name(location, available, keyset, paging)]
+
+def cars_count_statement(location, available):
+    """Registered COUNT(*) for an /api/cars filter shape"""
+    return STATEMENTS[_cars_count_name(location, available)]
+
+# ==================== RATE CARDS ====================
+
+# pricing.RateCards looks rates up by car_id in batches. The IN list is padded
+# to one of these sizes (repeating the last id), so quoting any number of cars
+# uses at most four statement texts; larger requests are split.
+RATE_BATCH_SIZES = (1, 4, 16, 64)
+
+def _rates_name(size):
+    return f"car.rates[{size}]"
+
+for _size in RATE_BATCH_SIZES:
+    STATEMENTS[_rates_name(_size)] = (
+        "SELECT car_id, rate FROM Car WHERE car_id IN ("
+        + ", ".join(f":id{i}" for i in range(_size)) + ")"
+    )
+
+def rates_statement(size):
+    """Registered rate lookup for an IN list of the given batch size"""
+    return STATEMENTS[_rates_name(size)]
+
+# ==================== LOOKUP ====================
+
+_NAMES = {sql: name for name, sql in STATEMENTS.items()}
+
+def sql(name):
+    """Text of a registered statement"""
+    return STATEMENTS[name]
+
+def statement_name(text):
+    """Registry name for a statement's text, or None for ad hoc SQL"""
+    return _NAMES.get(text)
@@ -0,0 +1,102 @@
+from config import STATS_CACHE_SIZE, STATS_CACHE_TTL
+from cache import LRUCache
+from db import Database
+from statements import sql
+from datetime import datetime, timedelta
+
+# Computed statistics by (window_days, months, top) and utilization pages by
+# ('cars', window_days, offset, limit), bounded because the keys come from the
+# query string. Booking, payment and car writes invalidate it;
+# the TTL bounds staleness for writes made by other workers or directly in
+# the database.
+stats_cache = LRUCache(STATS_CACHE_SIZE, STATS_CACHE_TTL)
+
+def _money(value):
+    return round(float(value or 0), 2)
+
+def _window(window_days):
+    """Utilization window: the last window_days days up to today"""
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    return {'window_start': today - timedelta(days=window_days - 1), 'window_end': today}
+
+def _car_rows(window, window_days, offset, limit):
+    rows = Database.execute_query(sql('stats.car_utilization'), {**window, 'offset': offset, 'fetch_rows': limit})
+    return [{
+        'car_id': int(row['CAR_ID']),
+        'car': f"{row['BRAND_NAME']} {row['MODEL_NAME']}",
+        'bookings': int(row['BOOKINGS']),
+        'booked_days': int(row['BOOKED_DAYS']),
+        'utilization': round(int(row['BOOKED_DAYS']) / window_days, 3)
+    } for row in rows]
+
+def fleet_stats(window_days=30, months=12, top=10):
+    """Dashboard summary from SQL aggregates, so its size does not grow with the number of bookings
+
+    Utilization covers the last window_days days up to today; revenue covers
+    bookings picking up from the start of the month months - 1 months ago.
+    Payment status aggregates every booking and utilization every booking in
+    the window, so each call is a full scan of what it covers; callers reuse
+    the result through stats_cache for STATS_CACHE_TTL (60 s by default).
+    Only the top cars by booked days are listed; car_utilization pages
+    through all of them.
+    """
+    window = _window(window_days)
+    today = window['window_end']
+    since = today.replace(day=1)
+    for _ in range(months - 1):
+        since = (since - timedelta(days=1)).replace(day=1)
+    upcoming = {'today': today, 'until': today + timedelta(days=7)}
+
+    status = {row['STATUS']: row for row in Database.execute_query(sql('stats.payment_status'))}
+    fleet = Database.execute_query(sql('stats.fleet_utilization'), window)[0]
+    capacity = int(fleet['CARS']) * window_days
+
+    return {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'payments': {
+            name.lower(): {'bookings': int(status[name]['BOOKINGS']) if name in status else 0,
+                           'amount': _money(status[name]['AMOUNT']) if name in status else 0.0}
+            for name in ('Paid', 'Pending')
+        },
+        'utilization': {
+            'window_start': window['window_start'].date().isoformat(),
+            'window_end': today.date().isoformat(),
+            'cars': int(fleet['CARS']),
+            'booked_days': int(fleet['BOOKED_DAYS']),
+            'fleet': round(int(fleet['BOOKED_DAYS']) / capacity, 3) if capacity else None,
+            'top_cars': _car_rows(window, window_days, 0, top)
+        },
+        'revenue_by_month': [{
+            'period': row['PERIOD'],
+            'bookings': int(row['BOOKINGS']),
+            'revenue': _money(row['REVENUE']),
+            'paid': _money(row['PAID'])
+        } for row in Database.execute_query(sql('stats.revenue_by_month'), {'since': since})],
+        'revenue_by_brand': [{
+            'brand': row['BRAND_NAME'],
+            'bookings': int(row['BOOKINGS']),
+            'revenue': _money(row['REVENUE']),
+            'paid': _money(row['PAID'])
+        } for row in Database.execute_query(sql('stats.revenue_by_brand'), {'since': since})],
+        'upcoming_pickups': {
+            'days': 7,
+            'count': int(Database.execute_query(sql('stats.upcoming_count'), upcoming)[0]['CNT']),
+            'bookings': Database.execute_query(sql('stats.upcoming_pickups'), {**upcoming, 'top': top}, json_ready=True)
+        }
+    }
+
+def car_utilization(window_days=30, offset=0, limit=50):
+    """One page of every car's utilization over the last window_days days, busiest first
+
+    Like fleet_stats, each page aggregates every booking in the window.
+    """
+    window = _window(window_days)
+    return {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'window_start': window['window_start'].date().isoformat(),
+        'window_end': window['window_end'].date().isoformat(),
+        'total': int(Database.execute_query(sql('stats.car_count'))[0]['CNT']),
+        'offset': offset,
+        'limit': limit,
+        'cars': _car_rows(window, window_days, offset, limit)
+    }
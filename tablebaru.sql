@@ -13,7 +13,7 @@ CREATE TABLE Customer (
     cust_email VARCHAR2(100) UNIQUE NOT NULL,
     cust_phone VARCHAR2(20),
     cust_username VARCHAR2(50) UNIQUE NOT NULL,
-    cust_password VARCHAR2(100) NOT NULL
+    cust_password VARCHAR2(255) NOT NULL
 );
 
 -- Create Staff Table (Self-Referencing)
@@ -24,8 +24,9 @@ CREATE TABLE Staff (
     staff_email VARCHAR2(100) UNIQUE NOT NULL,
     staff_phone VARCHAR2(20),
     staff_dept VARCHAR2(50),
+    staff_branch VARCHAR2(100),            -- pickup location served; NULL serves every location
     staff_username VARCHAR2(50) UNIQUE NOT NULL,
-    staff_password VARCHAR2(100) NOT NULL,
+    staff_password VARCHAR2(255) NOT NULL,
     manager_id NUMBER
 );
 
@@ -69,10 +70,32 @@ CREATE TABLE Car (
     dropoff_location VARCHAR2(255),
     available_locations VARCHAR2(500),
     allows_different_dropoff NUMBER(1) DEFAULT 1,
+    -- Denormalized from the Petrol/Diesel/Electric subtables for fast listing
+    fuel_type VARCHAR2(10) DEFAULT 'N/A' NOT NULL,
     -- Constraints
     CONSTRAINT fk_car_model FOREIGN KEY (model_id) REFERENCES Model(model_id),
     CONSTRAINT fk_car_type FOREIGN KEY (carType_id) REFERENCES CarType(carType_id),
-    CONSTRAINT chk_allows_different_dropoff CHECK (allows_different_dropoff IN (0, 1))
+    CONSTRAINT chk_allows_different_dropoff CHECK (allows_different_dropoff IN (0, 1)),
+    CONSTRAINT chk_car_fuel_type CHECK (fuel_type IN ('Petrol', 'Diesel', 'Electric', 'N/A'))
+);
+
+-- Normalized copy of Car.available_locations (one row per car and location)
+CREATE TABLE Car_Location (
+    car_id NUMBER NOT NULL,
+    location_name VARCHAR2(100) NOT NULL,
+    location_key VARCHAR2(100) NOT NULL,   -- UPPER(location_name), used for lookups
+    CONSTRAINT pk_car_location PRIMARY KEY (location_key, car_id),
+    CONSTRAINT fk_car_location_car FOREIGN KEY (car_id) REFERENCES Car(car_id)
+);
+
+CREATE TABLE Car_Image (
+    car_id NUMBER NOT NULL,
+    variant VARCHAR2(20) NOT NULL,         -- thumb / card / detail (see IMAGE_VARIANTS)
+    filename VARCHAR2(255) NOT NULL,
+    width NUMBER NOT NULL,
+    height NUMBER NOT NULL,
+    CONSTRAINT pk_car_image PRIMARY KEY (car_id, variant),
+    CONSTRAINT fk_car_image_car FOREIGN KEY (car_id) REFERENCES Car(car_id)
 );
 
 -- Note: Removed unnecessary circular FK from CarType to Car
@@ -134,7 +157,13 @@ CREATE TABLE Payment (
 -- 7. CREATE INDEXES FOR PERFORMANCE
 CREATE INDEX idx_car_pickup_location ON Car(pickup_location);
 CREATE INDEX idx_car_allows_dropoff ON Car(allows_different_dropoff);
+CREATE INDEX idx_car_fuel_type ON Car(fuel_type);
 CREATE INDEX idx_booking_pickup_date ON Booking(pickup_date);
 CREATE INDEX idx_booking_dropoff_date ON Booking(dropoff_date);
+CREATE INDEX idx_booking_car_dates ON Booking(car_id, pickup_date, dropoff_date);
+CREATE INDEX idx_booking_cust_dates ON Booking(cust_id, pickup_date, booking_id);
+CREATE INDEX idx_customer_email_lower ON Customer(LOWER(cust_email));
+CREATE INDEX idx_booking_staff_dates ON Booking(staff_id, dropoff_date);
+CREATE INDEX idx_car_location_car ON Car_Location(car_id);
 
 COMMIT;
\ No newline at end of file
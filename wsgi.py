@@ -0,0 +1,11 @@
+"""WSGI entry point for production servers
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Importing this module builds the Flask app (routes, asset manifest, caches)
+without starting the development server. gunicorn.conf.py loads it once in
+the master process and forks the workers from there.
+"""
+from app import app
+
+application = app